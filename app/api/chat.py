@@ -1,18 +1,37 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from typing import List, Dict, Any
+import asyncio
 import logging
 
 from app.models.chat import ChatRequest, ChatResponse, ChatMessage
 from app.services.rag_service import RAGService
+from app.api.dependencies import get_rag_service
+from app.api.errors import api_errors
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Dependency to get RAG service
-def get_rag_service() -> RAGService:
-    return RAGService()
+# In-flight chat requests keyed by chat cache key, so identical concurrent
+# requests (retries, several open tabs) share one RAG call
+_inflight_chats: Dict[str, asyncio.Future] = {}
+
+async def _chat_once(rag_service: RAGService, request: ChatRequest) -> ChatResponse:
+    """Get a chat response, joining an identical request already in flight"""
+    key = rag_service.chat_cache_key(request)
+    task = _inflight_chats.get(key)
+    if task is None:
+        task = asyncio.ensure_future(run_in_threadpool(rag_service.chat, request))
+        _inflight_chats[key] = task
+        task.add_done_callback(lambda _: _inflight_chats.pop(key, None))
+    else:
+        logger.info("Joining in-flight chat request")
+    # Shield so one cancelled caller doesn't cancel the shared call
+    return await asyncio.shield(task)
 
 @router.post("/chat", response_model=ChatResponse)
+@api_errors("Chat error")
 async def chat(
     request: ChatRequest,
     rag_service: RAGService = Depends(get_rag_service)
@@ -20,20 +39,30 @@ async def chat(
     """
     Chat with the fantasy football draft assistant using RAG capabilities
     """
-    try:
-        logger.info(f"Chat request received: {request.message[:100]}...")
-        
-        # Get response from RAG service
-        response = rag_service.chat(request)
-        
-        logger.info("Chat response generated successfully")
-        return response
-        
-    except Exception as e:
-        logger.error(f"Error in chat endpoint: {e}")
-        raise HTTPException(status_code=500, detail=f"Chat error: {str(e)}")
+    logger.info(f"Chat request received: {request.message[:100]}...")
+    
+    # Get response from RAG service
+    response = await _chat_once(rag_service, request)
+    
+    logger.info("Chat response generated successfully")
+    return response
+
+@router.post("/chat/stream")
+@api_errors("Chat stream error")
+async def chat_stream(
+    request: ChatRequest,
+    rag_service: RAGService = Depends(get_rag_service)
+):
+    """
+    Chat with the assistant, streaming the answer as plain text while it is generated
+    """
+    logger.info(f"Chat stream request received: {request.message[:100]}...")
+    
+    # Sync generator; Starlette iterates it in the threadpool
+    return StreamingResponse(rag_service.stream_chat(request), media_type="text/plain; charset=utf-8")
 
 @router.post("/chat/session/{session_id}", response_model=ChatResponse)
+@api_errors("Chat session error")
 async def chat_with_session(
     session_id: str,
     request: ChatRequest,
@@ -42,23 +71,18 @@ async def chat_with_session(
     """
     Chat with session management for conversation history
     """
-    try:
-        logger.info(f"Chat session request: {session_id}")
-        
-        # In a real implementation, you would:
-        # 1. Load session history from database
-        # 2. Add current message to history
-        # 3. Pass full history to RAG service
-        # 4. Save updated history
-        
-        # For now, just use the basic chat functionality
-        response = rag_service.chat(request)
-        
-        return response
-        
-    except Exception as e:
-        logger.error(f"Error in chat session endpoint: {e}")
-        raise HTTPException(status_code=500, detail=f"Chat session error: {str(e)}")
+    logger.info(f"Chat session request: {session_id}")
+    
+    # In a real implementation, you would:
+    # 1. Load session history from database
+    # 2. Add current message to history
+    # 3. Pass full history to RAG service
+    # 4. Save updated history
+    
+    # For now, just use the basic chat functionality
+    response = await _chat_once(rag_service, request)
+    
+    return response
 
 @router.get("/chat/sessions", response_model=List[Dict[str, Any]])
 async def get_chat_sessions():
@@ -76,44 +100,36 @@ async def get_chat_sessions():
     ]
 
 @router.delete("/chat/session/{session_id}")
+@api_errors("Delete session error")
 async def delete_chat_session(session_id: str):
     """
     Delete a chat session
     """
-    try:
-        logger.info(f"Deleting chat session: {session_id}")
-        
-        # In a real implementation, you would delete from database
-        # For now, just return success
-        
-        return {"message": f"Session {session_id} deleted successfully"}
-        
-    except Exception as e:
-        logger.error(f"Error deleting chat session: {e}")
-        raise HTTPException(status_code=500, detail=f"Delete session error: {str(e)}")
+    logger.info(f"Deleting chat session: {session_id}")
+    
+    # In a real implementation, you would delete from database
+    # For now, just return success
+    
+    return {"message": f"Session {session_id} deleted successfully"}
 
 @router.post("/chat/clear")
+@api_errors("Clear cache error")
 async def clear_chat_cache(
     rag_service: RAGService = Depends(get_rag_service)
 ):
     """
     Clear the chat cache in the backend
     """
-    try:
-        logger.info("Clearing chat cache...")
-        
-        # Clear the chat cache in the RAG service
-        rag_service.clear_chat_cache()
-        
-        logger.info("Chat cache cleared successfully")
-        return {
-            "message": "Chat cache cleared successfully",
-            "cache_size": 0
-        }
-        
-    except Exception as e:
-        logger.error(f"Error clearing chat cache: {e}")
-        raise HTTPException(status_code=500, detail=f"Clear cache error: {str(e)}")
+    logger.info("Clearing chat cache...")
+    
+    # Clear the chat cache in the RAG service
+    rag_service.clear_chat_cache()
+    
+    logger.info("Chat cache cleared successfully")
+    return {
+        "message": "Chat cache cleared successfully",
+        "cache_size": 0
+    }
 
 @router.get("/chat/health")
 async def chat_health():
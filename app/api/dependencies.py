@@ -0,0 +1,35 @@
+from typing import Optional
+
+from app.services.rag_service import RAGService
+from app.services.player_service import PlayerService
+
+# Shared service instances (created once at startup, reused by every request)
+_rag_service: Optional[RAGService] = None
+_player_service: Optional[PlayerService] = None
+
+def init_services():
+    """Create the shared service instances"""
+    global _rag_service, _player_service
+    if _rag_service is None:
+        _rag_service = RAGService()
+    if _player_service is None:
+        _player_service = PlayerService()
+
+def reset_services():
+    """Drop the shared RAG service and build a fresh one (new caches, chains and vector store)"""
+    global _rag_service
+    RAGService.reset_singleton()
+    _rag_service = RAGService()
+
+# Dependencies (async so FastAPI resolves them without a threadpool hop).
+# They take no parameters, so their Dependant has no sub-dependencies to solve;
+# FastAPI builds it once at route registration, not per request.
+async def get_rag_service() -> RAGService:
+    if _rag_service is None:
+        init_services()
+    return _rag_service
+
+async def get_player_service() -> PlayerService:
+    if _player_service is None:
+        init_services()
+    return _player_service
@@ -0,0 +1,24 @@
+import logging
+from functools import wraps
+
+from fastapi import HTTPException
+
+def api_errors(message: str):
+    """Log unexpected endpoint errors and turn them into 500 responses.
+
+    HTTPExceptions raised by the endpoint (400, 404, ...) pass through unchanged.
+    """
+    def decorator(func):
+        logger = logging.getLogger(func.__module__)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.exception("%s in %s", message, func.__name__)
+                raise HTTPException(status_code=500, detail=f"{message}: {str(e)}")
+        return wrapper
+    return decorator
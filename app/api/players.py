@@ -1,45 +1,110 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from typing import List, Dict, Any, Optional, Tuple
+import asyncio
 import logging
+import time
+import orjson
 
-from app.models.player import Player, PlayerAnalysis, Position
+from app.models.player import Player, PlayerAnalysis, parse_position
 from app.services.player_service import PlayerService
+from app.api.dependencies import get_player_service
+from app.api.errors import api_errors
+from app.middleware.response_cache import response_cache
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Dependency
-def get_player_service() -> PlayerService:
-    return PlayerService()
+# Compiled once and reused to validate whole player batches
+PLAYER_LIST_ADAPTER = TypeAdapter(List[Player])
+
+# Shared Sleeper sync: concurrent callers await one task, and a successful
+# result is reused briefly (the extension calls sync/sleeper then sync/espn)
+SLEEPER_SYNC_REUSE_SECONDS = 60
+_sleeper_sync_task: Optional[asyncio.Future] = None
+_sleeper_sync_result: Optional[Tuple[float, List[Player]]] = None
+
+async def _sync_sleeper_once(player_service: PlayerService) -> List[Player]:
+    """Sync with Sleeper, coalescing concurrent and back-to-back calls"""
+    global _sleeper_sync_task, _sleeper_sync_result
+    
+    if _sleeper_sync_result is not None:
+        synced_at, players = _sleeper_sync_result
+        if time.monotonic() - synced_at < SLEEPER_SYNC_REUSE_SECONDS:
+            return players
+    
+    if _sleeper_sync_task is None:
+        _sleeper_sync_task = asyncio.ensure_future(run_in_threadpool(player_service.sync_with_sleeper_api))
+    task = _sleeper_sync_task
+    try:
+        # Shield so one cancelled caller doesn't cancel the shared sync
+        players = await asyncio.shield(task)
+    finally:
+        if task.done() and _sleeper_sync_task is task:
+            _sleeper_sync_task = None
+    
+    if players:
+        _sleeper_sync_result = (time.monotonic(), players)
+    return players
+
+async def _iter_json_array(player_service: PlayerService, players: List[Player], batch_size: int = 200):
+    """Yield players as a JSON array, serializing one batch at a time.
+
+    Async so StreamingResponse doesn't hop to the threadpool for every chunk.
+    """
+    yield b"["
+    for start in range(0, len(players), batch_size):
+        rows = player_service.serialize_players(players[start:start + batch_size])
+        chunk = b",".join(orjson.dumps(row) for row in rows)
+        yield (b"," + chunk) if start else chunk
+    yield b"]"
+
+def _refresh_in_background(refresh, *args):
+    """Run a long player refresh, then drop cached player responses"""
+    try:
+        refresh(*args)
+    finally:
+        response_cache.invalidate("/api/players")
 
 @router.get("/players", response_model=List[Player])
+@api_errors("Error retrieving players")
 async def get_players(
     position: Optional[str] = Query(None, description="Filter by position"),
     limit: int = Query(50, description="Number of players to return"),
+    stream: bool = Query(False, description="Stream the list as a chunked JSON array"),
     player_service: PlayerService = Depends(get_player_service)
 ):
     """
     Get list of players with optional filtering
     """
-    try:
-        if position:
-            try:
-                pos_enum = Position(position.upper())
-                players = player_service.get_players_by_position(pos_enum)
-            except ValueError:
-                raise HTTPException(status_code=400, detail=f"Invalid position: {position}")
-        else:
-            players = list(player_service.players_cache.values())
-        
-        # Sort by rank and limit
-        sorted_players = sorted(players, key=lambda p: p.rank or float('inf'))
-        return sorted_players[:limit]
-        
-    except Exception as e:
-        logger.error(f"Error getting players: {e}")
-        raise HTTPException(status_code=500, detail=f"Error retrieving players: {str(e)}")
+    if position:
+        pos_enum = parse_position(position)
+        if pos_enum is None:
+            raise HTTPException(status_code=400, detail=f"Invalid position: {position}")
+        players = player_service.get_top_players(position=pos_enum, limit=limit)
+    else:
+        players = player_service.get_top_players(limit=limit)
+    
+    if stream:
+        return StreamingResponse(_iter_json_array(player_service, players), media_type="application/json")
+    
+    # Return pre-serialized rows directly (skips response_model re-validation)
+    return ORJSONResponse(player_service.serialize_players(players))
+
+@router.get("/players/positions", response_model=Dict[str, int])
+@api_errors("Error retrieving position counts")
+async def get_position_counts(
+    player_service: PlayerService = Depends(get_player_service)
+):
+    """
+    Get count of players by position
+    """
+    return player_service.get_position_counts()
 
 @router.get("/players/{player_id}", response_model=Player)
+@api_errors("Error retrieving player")
 async def get_player(
     player_id: str,
     player_service: PlayerService = Depends(get_player_service)
@@ -47,19 +112,13 @@ async def get_player(
     """
     Get specific player by ID
     """
-    try:
-        player = player_service.get_player_by_id(player_id)
-        if not player:
-            raise HTTPException(status_code=404, detail=f"Player {player_id} not found")
-        return player
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting player {player_id}: {e}")
-        raise HTTPException(status_code=500, detail=f"Error retrieving player: {str(e)}")
+    player = player_service.get_player_by_id(player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail=f"Player {player_id} not found")
+    return player
 
 @router.get("/players/search/{name}", response_model=List[Player])
+@api_errors("Error searching players")
 async def search_players(
     name: str,
     limit: int = Query(10, description="Number of results to return"),
@@ -68,24 +127,11 @@ async def search_players(
     """
     Search players by name
     """
-    try:
-        # Simple name search (case-insensitive)
-        matching_players = []
-        search_name = name.lower()
-        
-        for player in player_service.players_cache.values():
-            if search_name in player.name.lower():
-                matching_players.append(player)
-        
-        # Sort by rank and limit
-        sorted_players = sorted(matching_players, key=lambda p: p.rank or float('inf'))
-        return sorted_players[:limit]
-        
-    except Exception as e:
-        logger.error(f"Error searching players: {e}")
-        raise HTTPException(status_code=500, detail=f"Error searching players: {str(e)}")
+    players = player_service.search_players(name, limit=limit)
+    return ORJSONResponse(player_service.serialize_players(players))
 
 @router.get("/players/{player_id}/analysis", response_model=PlayerAnalysis)
+@api_errors("Error retrieving player analysis")
 async def get_player_analysis(
     player_id: str,
     player_service: PlayerService = Depends(get_player_service)
@@ -93,19 +139,13 @@ async def get_player_analysis(
     """
     Get detailed analysis for a specific player
     """
-    try:
-        analysis = player_service.get_player_analysis(player_id)
-        if not analysis:
-            raise HTTPException(status_code=404, detail=f"Player {player_id} not found")
-        return analysis
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting player analysis for {player_id}: {e}")
-        raise HTTPException(status_code=500, detail=f"Error retrieving player analysis: {str(e)}")
+    analysis = await run_in_threadpool(player_service.get_player_analysis, player_id)
+    if not analysis:
+        raise HTTPException(status_code=404, detail=f"Player {player_id} not found")
+    return analysis
 
 @router.get("/players/top/{position}", response_model=List[Player])
+@api_errors("Error retrieving top players")
 async def get_top_players_by_position(
     position: str,
     limit: int = Query(20, description="Number of players to return"),
@@ -114,22 +154,15 @@ async def get_top_players_by_position(
     """
     Get top players by position
     """
-    try:
-        try:
-            pos_enum = Position(position.upper())
-        except ValueError:
-            raise HTTPException(status_code=400, detail=f"Invalid position: {position}")
-        
-        players = player_service.get_top_players(position=pos_enum, limit=limit)
-        return players
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting top players for {position}: {e}")
-        raise HTTPException(status_code=500, detail=f"Error retrieving top players: {str(e)}")
+    pos_enum = parse_position(position)
+    if pos_enum is None:
+        raise HTTPException(status_code=400, detail=f"Invalid position: {position}")
+    
+    players = player_service.get_top_players(position=pos_enum, limit=limit)
+    return ORJSONResponse(player_service.serialize_players(players))
 
 @router.post("/players", response_model=Player)
+@api_errors("Error creating player")
 async def create_player(
     player: Player,
     player_service: PlayerService = Depends(get_player_service)
@@ -137,15 +170,11 @@ async def create_player(
     """
     Create a new player
     """
-    try:
-        player_service.add_player(player)
-        return player
-        
-    except Exception as e:
-        logger.error(f"Error creating player: {e}")
-        raise HTTPException(status_code=500, detail=f"Error creating player: {str(e)}")
+    await run_in_threadpool(player_service.add_player, player)
+    return player
 
 @router.put("/players/{player_id}", response_model=Player)
+@api_errors("Error updating player")
 async def update_player(
     player_id: str,
     player: Player,
@@ -154,21 +183,15 @@ async def update_player(
     """
     Update an existing player
     """
-    try:
-        # Ensure the player ID matches
-        if player.id != player_id:
-            raise HTTPException(status_code=400, detail="Player ID mismatch")
-        
-        player_service.add_player(player)
-        return player
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error updating player {player_id}: {e}")
-        raise HTTPException(status_code=500, detail=f"Error updating player: {str(e)}")
+    # Ensure the player ID matches
+    if player.id != player_id:
+        raise HTTPException(status_code=400, detail="Player ID mismatch")
+    
+    await run_in_threadpool(player_service.add_player, player)
+    return player
 
 @router.delete("/players/{player_id}")
+@api_errors("Error deleting player")
 async def delete_player(
     player_id: str,
     player_service: PlayerService = Depends(get_player_service)
@@ -176,22 +199,13 @@ async def delete_player(
     """
     Delete a player
     """
-    try:
-        if player_id not in player_service.players_cache:
-            raise HTTPException(status_code=404, detail=f"Player {player_id} not found")
-        
-        del player_service.players_cache[player_id]
-        player_service.save_player_data()
-        
-        return {"message": f"Player {player_id} deleted successfully"}
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error deleting player {player_id}: {e}")
-        raise HTTPException(status_code=500, detail=f"Error deleting player: {str(e)}")
+    if not await run_in_threadpool(player_service.delete_player, player_id):
+        raise HTTPException(status_code=404, detail=f"Player {player_id} not found")
+    
+    return {"message": f"Player {player_id} deleted successfully"}
 
 @router.post("/players/bulk", response_model=List[Player])
+@api_errors("Error creating players")
 async def create_players_bulk(
     players: List[Player],
     player_service: PlayerService = Depends(get_player_service)
@@ -199,34 +213,11 @@ async def create_players_bulk(
     """
     Create multiple players at once
     """
-    try:
-        player_service.add_players(players)
-        return players
-        
-    except Exception as e:
-        logger.error(f"Error creating players bulk: {e}")
-        raise HTTPException(status_code=500, detail=f"Error creating players: {str(e)}")
-
-@router.get("/players/positions", response_model=Dict[str, int])
-async def get_position_counts(
-    player_service: PlayerService = Depends(get_player_service)
-):
-    """
-    Get count of players by position
-    """
-    try:
-        position_counts = {}
-        for player in player_service.players_cache.values():
-            pos = player.position
-            position_counts[pos] = position_counts.get(pos, 0) + 1
-        
-        return position_counts
-        
-    except Exception as e:
-        logger.error(f"Error getting position counts: {e}")
-        raise HTTPException(status_code=500, detail=f"Error retrieving position counts: {str(e)}")
+    await run_in_threadpool(player_service.add_players, players)
+    return ORJSONResponse(player_service.serialize_players(players))
 
 @router.post("/players/scrape", response_model=List[Player])
+@api_errors("Error scraping player data")
 async def scrape_player_data(
     source: str = Query("espn", description="Data source (espn, yahoo)"),
     player_service: PlayerService = Depends(get_player_service)
@@ -234,49 +225,33 @@ async def scrape_player_data(
     """
     Scrape player data from external sources
     """
-    try:
-        players = player_service.scrape_player_data(source)
-        
-        if players:
-            player_service.add_players(players)
-        
-        return players
-        
-    except Exception as e:
-        logger.error(f"Error scraping player data: {e}")
-        raise HTTPException(status_code=500, detail=f"Error scraping player data: {str(e)}")
+    # Blocking upstream I/O runs in the threadpool, not on the event loop.
+    # Scraped players are already persisted by the sync itself.
+    players = await run_in_threadpool(player_service.scrape_player_data, source)
+    return players
 
 @router.post("/players/sync/sleeper", response_model=List[Player])
+@api_errors("Error syncing with Sleeper API")
 async def sync_sleeper_players(
     player_service: PlayerService = Depends(get_player_service)
 ):
     """
     Sync player data from Sleeper API
     """
-    try:
-        players = player_service.sync_with_sleeper_api()
-        return players
-        
-    except Exception as e:
-        logger.error(f"Error syncing with Sleeper API: {e}")
-        raise HTTPException(status_code=500, detail=f"Error syncing with Sleeper API: {str(e)}")
+    return await _sync_sleeper_once(player_service)
 
 @router.post("/players/sync/espn", response_model=List[Player])
+@api_errors("Error syncing with Sleeper API")
 async def sync_espn_players(
     player_service: PlayerService = Depends(get_player_service)
 ):
     """
-    Sync player data from ESPN API
+    Sync player data from ESPN API (alias of /players/sync/sleeper, ESPN data now comes from Sleeper)
     """
-    try:
-        players = player_service.sync_with_sleeper_api()
-        return players
-        
-    except Exception as e:
-        logger.error(f"Error syncing with Sleeper API: {e}")
-        raise HTTPException(status_code=500, detail=f"Error syncing with Sleeper API: {str(e)}")
+    return await _sync_sleeper_once(player_service)
 
 @router.post("/players/enrich", response_model=List[Player])
+@api_errors("Error enriching players")
 async def enrich_players(
     request: Dict[str, Any],
     source: str = Query("sleeper", description="Data source (sleeper, espn)"),
@@ -285,11 +260,14 @@ async def enrich_players(
     """
     Enrich player data with API information
     """
+    # Extract players from request body
+    players_data = request.get("players", [])
+    
+    # Convert to Player objects in one batch, falling back to per-item
+    # validation so a single bad entry doesn't reject the whole request
     try:
-        # Extract players from request body
-        players_data = request.get("players", [])
-        
-        # Convert to Player objects
+        players = PLAYER_LIST_ADAPTER.validate_python(players_data)
+    except ValidationError:
         players = []
         for player_data in players_data:
             try:
@@ -298,41 +276,37 @@ async def enrich_players(
             except Exception as e:
                 logger.warning(f"Invalid player data: {e}")
                 continue
-        
-        enriched_players = player_service.get_enriched_players(players, source)
-        return enriched_players
-        
-    except Exception as e:
-        logger.error(f"Error enriching players: {e}")
-        raise HTTPException(status_code=500, detail=f"Error enriching players: {str(e)}")
+    
+    enriched_players = await run_in_threadpool(player_service.get_enriched_players, players, source)
+    return enriched_players
 
-@router.post("/players/update-rankings")
+@router.post("/players/update-rankings", status_code=202)
+@api_errors("Error updating player rankings")
 async def update_player_rankings(
+    background_tasks: BackgroundTasks,
     player_service: PlayerService = Depends(get_player_service)
 ):
     """
-    Update player rankings from external APIs
+    Update player rankings from external APIs (runs in the background)
     """
-    try:
-        player_service.update_player_rankings()
-        return {"message": "Player rankings updated successfully"}
-        
-    except Exception as e:
-        logger.error(f"Error updating player rankings: {e}")
-        raise HTTPException(status_code=500, detail=f"Error updating player rankings: {str(e)}")
+    background_tasks.add_task(_refresh_in_background, player_service.update_player_rankings)
+    return {"message": "Player rankings update started"}
 
 @router.get("/players/health")
-async def players_health():
+async def players_health(
+    player_service: PlayerService = Depends(get_player_service)
+):
     """
     Health check for players service
     """
     return {
         "status": "healthy",
         "service": "players",
-        "cache_size": len(PlayerService().players_cache)
+        "cache_size": len(player_service.players_cache)
     } 
 
 @router.post("/players/sync")
+@api_errors("Sync error")
 async def sync_player_data(
     source: str = "sleeper",
     player_service: PlayerService = Depends(get_player_service)
@@ -340,37 +314,24 @@ async def sync_player_data(
     """
     Sync player data from external APIs to populate missing stats
     """
-    try:
-        logger.info(f"Starting player data sync from {source}")
-        
-        if source == "sleeper":
-            players = player_service.sync_with_sleeper_api()
-        elif source == "espn":
-            players = player_service.sync_with_sleeper_api()  # ESPN endpoint now uses Sleeper
-        else:
-            raise HTTPException(status_code=400, detail=f"Unknown source: {source}")
-        
-        # Enrich existing players with API data
-        enriched_count = 0
-        for player in player_service.players_cache.values():
-            if not player.projected_points or not player.last_year_points:
-                enriched_player = player_service.enrich_player_with_api_data(player, source)
-                if enriched_player and (enriched_player.projected_points or enriched_player.last_year_points):
-                    enriched_count += 1
-        
-        logger.info(f"Synced {len(players)} players, enriched {enriched_count} existing players")
-        
-        return {
-            "message": f"Player data synced successfully from {source}",
-            "total_players": len(players),
-            "enriched_players": enriched_count
-        }
-        
-    except Exception as e:
-        logger.error(f"Error syncing player data: {e}")
-        raise HTTPException(status_code=500, detail=f"Sync error: {str(e)}")
+    logger.info(f"Starting player data sync from {source}")
+    
+    if source not in ("sleeper", "espn"):  # ESPN endpoint now uses Sleeper
+        raise HTTPException(status_code=400, detail=f"Unknown source: {source}")
+    
+    # One upstream fetch both syncs the cache and enriches players missing stats
+    players, enriched_count = await run_in_threadpool(player_service.sync_and_enrich_with_sleeper_api)
+    
+    logger.info(f"Synced {len(players)} players, enriched {enriched_count} existing players")
+    
+    return {
+        "message": f"Player data synced successfully from {source}",
+        "total_players": len(players),
+        "enriched_players": enriched_count
+    }
 
 @router.post("/players/enrich-specific")
+@api_errors("Enrichment error")
 async def enrich_specific_players(
     player_names: List[str],
     source: str = "sleeper",
@@ -379,26 +340,15 @@ async def enrich_specific_players(
     """
     Enrich specific players with API data
     """
-    try:
-        enriched_players = []
-        
-        for name in player_names:
-            player = player_service.get_player_by_name(name)
-            if player:
-                enriched_player = player_service.enrich_player_with_api_data(player, source)
-                if enriched_player:
-                    enriched_players.append(enriched_player)
-        
-        return {
-            "message": f"Enriched {len(enriched_players)} players",
-            "enriched_players": [p.name for p in enriched_players]
-        }
-        
-    except Exception as e:
-        logger.error(f"Error enriching players: {e}")
-        raise HTTPException(status_code=500, detail=f"Enrichment error: {str(e)}")
+    enriched_players = await run_in_threadpool(player_service.enrich_players_by_names, player_names)
+    
+    return {
+        "message": f"Enriched {len(enriched_players)} players",
+        "enriched_players": [p.name for p in enriched_players]
+    }
 
 @router.get("/players/stats/{player_name}")
+@api_errors("Stats error")
 async def get_player_stats(
     player_name: str,
     source: str = "sleeper",
@@ -407,45 +357,37 @@ async def get_player_stats(
     """
     Get detailed stats for a specific player
     """
-    try:
-        player = player_service.get_player_by_name(player_name)
-        if not player:
-            raise HTTPException(status_code=404, detail=f"Player {player_name} not found")
-        
-        # Try to enrich with API data
-        enriched_player = player_service.enrich_player_with_api_data(player, source)
-        
-        return {
-            "player": enriched_player.dict(),
-            "has_projected_points": enriched_player.projected_points is not None,
-            "has_last_year_points": enriched_player.last_year_points is not None,
-            "has_value_score": enriched_player.value_score is not None
-        }
-        
-    except Exception as e:
-        logger.error(f"Error getting player stats: {e}")
-        raise HTTPException(status_code=500, detail=f"Stats error: {str(e)}") 
+    player = await run_in_threadpool(player_service.get_player_by_name, player_name)
+    if not player:
+        raise HTTPException(status_code=404, detail=f"Player {player_name} not found")
+    
+    # Try to enrich with API data
+    enriched_player = await run_in_threadpool(player_service.enrich_player_with_api_data, player, source)
+    
+    return {
+        "player": enriched_player.model_dump(),
+        "has_projected_points": enriched_player.projected_points is not None,
+        "has_last_year_points": enriched_player.last_year_points is not None,
+        "has_value_score": enriched_player.value_score is not None
+    }
 
 @router.post("/players/populate-mock")
+@api_errors("Mock data error")
 async def populate_mock_data(
     player_service: PlayerService = Depends(get_player_service)
 ):
     """
     Populate mock data for players missing stats (for testing)
     """
-    try:
-        updated_count = player_service.populate_mock_data()
-        
-        return {
-            "message": f"Populated mock data for {updated_count} players",
-            "updated_count": updated_count
-        }
-        
-    except Exception as e:
-        logger.error(f"Error populating mock data: {e}")
-        raise HTTPException(status_code=500, detail=f"Mock data error: {str(e)}") 
+    updated_count = await run_in_threadpool(player_service.populate_mock_data)
+    
+    return {
+        "message": f"Populated mock data for {updated_count} players",
+        "updated_count": updated_count
+    }
 
 @router.post("/players/enrich-sleeper")
+@api_errors("Sleeper enrichment error")
 async def enrich_players_from_sleeper(
     player_names: List[str],
     player_service: PlayerService = Depends(get_player_service)
@@ -453,22 +395,18 @@ async def enrich_players_from_sleeper(
     """
     Enrich specific players with real data from Sleeper API
     """
-    try:
-        logger.info(f"Enriching {len(player_names)} players from Sleeper API")
-        
-        enriched_players = player_service.enrich_players_from_sleeper(player_names)
-        
-        return {
-            "message": f"Enriched {len(enriched_players)} players with real Sleeper data",
-            "enriched_players": [p.name for p in enriched_players],
-            "players_with_stats": [p.name for p in enriched_players if p.projected_points or p.last_year_points]
-        }
-        
-    except Exception as e:
-        logger.error(f"Error enriching players from Sleeper: {e}")
-        raise HTTPException(status_code=500, detail=f"Sleeper enrichment error: {str(e)}")
+    logger.info(f"Enriching {len(player_names)} players from Sleeper API")
+    
+    enriched_players = await run_in_threadpool(player_service.enrich_players_from_sleeper, player_names)
+    
+    return {
+        "message": f"Enriched {len(enriched_players)} players with real Sleeper data",
+        "enriched_players": [p.name for p in enriched_players],
+        "players_with_stats": [p.name for p in enriched_players if p.projected_points or p.last_year_points]
+    }
 
 @router.get("/players/sleeper/{player_name}")
+@api_errors("Sleeper player error")
 async def get_sleeper_player(
     player_name: str,
     player_service: PlayerService = Depends(get_player_service)
@@ -476,20 +414,15 @@ async def get_sleeper_player(
     """
     Get real player data from Sleeper API by name
     """
-    try:
-        player = player_service.get_sleeper_player_by_name(player_name)
-        
-        if not player:
-            raise HTTPException(status_code=404, detail=f"Player {player_name} not found in Sleeper")
-        
-        return {
-            "player": player.dict(),
-            "has_projected_points": player.projected_points is not None,
-            "has_last_year_points": player.last_year_points is not None,
-            "has_value_score": player.value_score is not None,
-            "source": "sleeper"
-        }
-        
-    except Exception as e:
-        logger.error(f"Error getting Sleeper player: {e}")
-        raise HTTPException(status_code=500, detail=f"Sleeper player error: {str(e)}") 
\ No newline at end of file
+    player = await run_in_threadpool(player_service.get_sleeper_player_by_name, player_name)
+    
+    if not player:
+        raise HTTPException(status_code=404, detail=f"Player {player_name} not found in Sleeper")
+    
+    return {
+        "player": player.model_dump(),
+        "has_projected_points": player.projected_points is not None,
+        "has_last_year_points": player.last_year_points is not None,
+        "has_value_score": player.value_score is not None,
+        "source": "sleeper"
+    }
\ No newline at end of file
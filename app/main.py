@@ -1,36 +1,77 @@
+from contextlib import asynccontextmanager
+import logging
+import logging.handlers
+import queue
+import sys
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 import uvicorn
 import os
 from dotenv import load_dotenv
 
 from app.api import chat, recommendations, players
-from app.services.rag_service import RAGService
-from app.services.player_service import PlayerService
+from app.api.dependencies import init_services
+from app.services.api_service import close_http_session
+from app.middleware.response_cache import ResponseCacheMiddleware, response_cache
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+def configure_logging() -> logging.handlers.QueueListener:
+    """Route app logs through a queue so stdout writes happen off the event loop"""
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    app_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    app_logger.propagate = False
+    
+    return logging.handlers.QueueListener(log_queue, stream_handler)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize shared services once at startup"""
+    log_listener = configure_logging()
+    log_listener.start()
+    try:
+        init_services()
+        yield
+    finally:
+        close_http_session()
+        log_listener.stop()
+
 # Create FastAPI app
 app = FastAPI(
     title="Fantasy Football Draft Assistant API",
     description="AI-powered fantasy football draft assistant with RAG capabilities",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-# Configure CORS
+# Cache read-only player endpoints (writes under the same prefix invalidate it)
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Allow all origins (for development)
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    ResponseCacheMiddleware,
+    cache=response_cache,
+    prefixes=["/api/players"],
+    exclude=["/api/players/health"],
 )
 
-# Initialize services
-rag_service = RAGService()
-player_service = PlayerService()
+# Configure CORS for the Chrome extension and local dev pages
+CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:8000,http://127.0.0.1:8000").split(",")
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=[origin.strip() for origin in CORS_ORIGINS if origin.strip()],
+    allow_origin_regex=r"chrome-extension://[a-p]{32}",
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["content-type", "authorization"],
+)
 
 # Include API routes
 app.include_router(chat.router, prefix="/api", tags=["chat"])
@@ -59,10 +100,15 @@ async def health_check():
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
-    """Global exception handler"""
+    """Global exception handler (endpoints let unexpected errors propagate here)"""
+    logger.exception("Unhandled error on %s %s", request.method, request.url.path, exc_info=exc)
     return JSONResponse(
         status_code=500,
-        content={"detail": f"Internal server error: {str(exc)}"}
+        content={
+            "detail": f"Internal server error: {str(exc)}",
+            "error": type(exc).__name__,
+            "path": request.url.path
+        }
     )
 
 if __name__ == "__main__":
@@ -70,5 +116,9 @@ if __name__ == "__main__":
         "app.main:app",
         host=os.getenv("HOST", "0.0.0.0"),
         port=int(os.getenv("PORT", 8000)),
-        reload=os.getenv("DEBUG", "False").lower() == "true"
+        reload=os.getenv("DEBUG", "False").lower() == "true",
+        # uvloop is not available on Windows
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=int(os.getenv("WORKERS", 1))
     ) 
\ No newline at end of file
@@ -0,0 +1,109 @@
+import time
+import logging
+from typing import Dict, Any, List, Tuple, Iterable
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """In-memory store for cached GET responses"""
+
+    def __init__(self, max_age: int = 60, max_entries: int = 512):
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, int, List[Tuple[bytes, bytes]], bytes]] = {}
+
+    def get(self, key: str):
+        """Get a cached response if it is still fresh"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= self.max_age:
+            del self._entries[key]
+            return None
+        return entry
+
+    def set(self, key: str, status: int, headers: List[Tuple[bytes, bytes]], body: bytes):
+        """Store a response, dropping the oldest entry when full"""
+        if len(self._entries) >= self.max_entries:
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (time.monotonic(), status, headers, body)
+
+    def invalidate(self, prefix: str = ""):
+        """Drop all cached responses whose path starts with prefix"""
+        if not prefix:
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+# Shared cache used by the middleware and by code that mutates cached data
+response_cache = ResponseCache()
+
+class ResponseCacheMiddleware:
+    """ASGI middleware caching GET responses for read-heavy routes.
+
+    Any non-GET request under a cached prefix invalidates that prefix once
+    its response (and any background task) has completed.
+    """
+
+    def __init__(self, app, cache: ResponseCache = response_cache,
+                 prefixes: Iterable[str] = (), exclude: Iterable[str] = ()):
+        self.app = app
+        self.cache = cache
+        self.prefixes = tuple(prefixes)
+        self.exclude = frozenset(exclude)
+
+    async def __call__(self, scope: Dict[str, Any], receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        prefix = next((p for p in self.prefixes if path.startswith(p)), None)
+        if prefix is None or path in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] != "GET":
+            # Invalidate once the mutation has happened, not before: a GET served
+            # while the handler runs would otherwise re-cache pre-mutation data
+            async def invalidate_when_done(message):
+                await send(message)
+                if message["type"] == "http.response.body" and not message.get("more_body", False):
+                    self.cache.invalidate(prefix)
+
+            try:
+                await self.app(scope, receive, invalidate_when_done)
+            finally:
+                # Again after background tasks, which run once the response is sent
+                self.cache.invalidate(prefix)
+            return
+
+        query = scope.get("query_string", b"").decode("latin-1")
+        key = f"{path}?{'&'.join(sorted(query.split('&')))}" if query else path
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            _, status, headers, body = cached
+            await send({"type": "http.response.start", "status": status,
+                        "headers": headers + [(b"x-cache", b"HIT")]})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        start_message = {}
+        chunks = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start_message.update(message)
+                message = dict(message, headers=list(message.get("headers", [])) + [(b"x-cache", b"MISS")])
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False) and start_message.get("status") == 200:
+                    self.cache.set(key, 200, list(start_message.get("headers", [])), b"".join(chunks))
+            await send(message)
+
+        await self.app(scope, receive, capture)
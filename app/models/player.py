@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any, Union
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List, Dict, Any
 from enum import Enum
 
 class Position(str, Enum):
@@ -10,23 +10,35 @@ class Position(str, Enum):
     K = "K"
     DEF = "DEF"
 
+# Precomputed lookup from position string (upper or lower case) to enum member
+POSITION_LOOKUP = {p.value: p for p in Position} | {p.value.lower(): p for p in Position}
+
+def parse_position(value: str) -> Optional[Position]:
+    """Get Position for a (case-insensitive) string, or None if unknown"""
+    position = POSITION_LOOKUP.get(value)
+    if position is None:
+        position = POSITION_LOOKUP.get(value.upper())
+    return position
+
 class Player(BaseModel):
     """Player model for fantasy football data"""
     id: str
     name: str
     position: Position
     team: str
-    rank: Optional[Union[int, str]] = None
-    adp: Optional[Union[float, str]] = None  # Average Draft Position
-    projected_points: Optional[Union[float, str]] = None
-    value_score: Optional[Union[float, str]] = None
+    rank: Optional[int] = None
+    adp: Optional[float] = None  # Average Draft Position
+    projected_points: Optional[float] = None
+    last_year_points: Optional[float] = None
+    value_score: Optional[float] = None
     injury_status: Optional[str] = None
     bye_week: Optional[int] = None
     age: Optional[int] = None
     experience: Optional[int] = None
     
-    class Config:
-        from_attributes = True
+    # Players are shared between caches and indexes, so they are immutable;
+    # use model_copy(update=...) to change fields
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 class PlayerAnalysis(BaseModel):
     """Detailed player analysis"""
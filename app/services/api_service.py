@@ -1,54 +1,278 @@
+import hashlib
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import ijson
+import orjson
 import os
+import pickle
+import threading
 import time
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+import zstandard
+from email.utils import formatdate
+from typing import List, Optional, Dict, Any, Set, Tuple
 from app.models.player import Player, Position
+from app.services.ttl_cache import LRUTTLCache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# The Sleeper players payload is stream-parsed with ijson; its pure-Python
+# backend is an order of magnitude slower than the bundled C (yajl2_c) one
+if ijson.backend == "python":
+    logger.warning("ijson is using its pure-Python backend; Sleeper cache refreshes will be slow")
+
+# Bump when the pickled Sleeper cache layout (or the Player model) changes
+SLEEPER_CACHE_VERSION = 3
+
+# One HTTP session shared by every APIService, so Sleeper calls reuse
+# keep-alive connections instead of opening a new TLS connection each time
+_http_session: Optional[requests.Session] = None
+
+def get_http_session() -> requests.Session:
+    """Get the shared HTTP session, creating it on first use"""
+    global _http_session
+    if _http_session is None:
+        session = requests.Session()
+        # Pooled keep-alive connections, retrying transient upstream failures
+        retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504],
+                        allowed_methods=["GET"])
+        session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries))
+        # Sleeper serves the multi-MB players payload much smaller compressed
+        session.headers["Accept-Encoding"] = "gzip, deflate"
+        _http_session = session
+    return _http_session
+
+def close_http_session():
+    """Close the shared HTTP session (called on app shutdown)"""
+    global _http_session
+    if _http_session is not None:
+        _http_session.close()
+        _http_session = None
+
+# Sleeper position strings for the fantasy positions we track
+_SLEEPER_POSITIONS: Dict[str, Position] = {
+    'QB': Position.QB,
+    'RB': Position.RB,
+    'WR': Position.WR,
+    'TE': Position.TE,
+    'K': Position.K,
+    'DEF': Position.DEF,
+}
+
+# Base season projections by position for (top, mid, bottom) rank tiers
+_PROJECTION_TIERS: Dict[Position, Tuple[int, int, int]] = {
+    Position.QB: (350, 280, 200),
+    Position.RB: (280, 200, 120),
+    Position.WR: (220, 160, 100),
+    Position.TE: (150, 120, 80),
+    Position.K: (160, 130, 110),
+    Position.DEF: (140, 120, 100),
+}
+
+# Sleeper mapping helpers are module-level pure functions (no APIService state)
+def _stable_variance(key: str, spread: int) -> int:
+    """Deterministic pseudo-random offset in [-spread, spread) derived from key.
+
+    Unlike hash(), this is stable across processes, so cached and freshly
+    mapped players agree.
+    """
+    digest = hashlib.blake2b(key.encode(), digest_size=4).digest()
+    return int.from_bytes(digest, "little") % (2 * spread) - spread
+
+def _map_sleeper_player(player_id: str, player_data: Dict[str, Any]) -> Optional[Player]:
+    """Map Sleeper API player data to our Player model - using real fantasy data"""
+    try:
+        # Most of the Sleeper dump is non-fantasy positions (OL, DL, LB, ...),
+        # so reject those before doing any other work
+        position = _map_sleeper_position(player_data.get('position', ''))
+        if not position:
+            return None
+        
+        # Extract basic info
+        first_name = player_data.get('first_name', '')
+        last_name = player_data.get('last_name', '')
+        full_name = f"{first_name} {last_name}".strip()
+        
+        if not full_name:
+            return None
+        
+        # Extract other data with proper None handling
+        team = player_data.get('team', '')
+        if team is None:
+            team = 'FA'  # Free Agent if no team
+        
+        age = player_data.get('age')
+        experience = player_data.get('years_exp')
+        injury_status = player_data.get('injury_status')
+        
+        # Use real Sleeper fantasy data
+        search_rank = player_data.get('search_rank')
+        
+        # Convert search_rank to fantasy rank (skip default values)
+        if search_rank and search_rank != 9999999:
+            rank = int(search_rank)
+            
+            # Generate ADP based on rank with some variance
+            adp_variance = _stable_variance(player_id, 10)  # ±10 picks
+            adp = float(max(1, rank + adp_variance))  # Whole picks, no rounding needed
+            
+            # Value score based on ADP vs rank: 7 +/- a tenth of the difference,
+            # clamped to [1, 10] (adp is always positive here)
+            if rank > 0:
+                value_score = min(10.0, max(1.0, 7.0 + (adp - rank) / 10))
+            else:
+                value_score = max(1.0, 10.0 - (rank / 30))
+            value_score = round(value_score, 1)
+        else:
+            rank = None
+            adp = None
+            value_score = None
+        
+        # Generate realistic projections based on position and rank
+        if isinstance(rank, int):
+            projected_points = _generate_projection_from_rank(rank, position)
+        else:
+            projected_points = None
+        
+        # Create player object with real fantasy data. Every field was just
+        # computed with its model type, so skip Pydantic validation.
+        player = Player.model_construct(
+            id=player_id,
+            name=full_name,
+            position=position,
+            team=team,
+            rank=rank,
+            adp=adp,
+            projected_points=projected_points,
+            value_score=value_score,
+            injury_status=injury_status,
+            bye_week=None,  # Sleeper doesn't provide bye week in basic data
+            age=age,
+            experience=experience
+        )
+        
+        return player
+        
+    except Exception as e:
+        logger.error(f"❌ Error mapping Sleeper player {player_id}: {e}")
+        return None
+
+def _map_sleeper_position(position_str: str) -> Optional[Position]:
+    """Map Sleeper position to our Position enum"""
+    return _SLEEPER_POSITIONS.get(position_str)
+
+def _generate_projection_from_rank(rank: int, position: Position) -> float:
+    """Generate realistic projection based on Sleeper rank and position"""
+    # Rank tier: 0 = top 50, 1 = top 150, 2 = everyone else
+    tier = (rank > 50) + (rank > 150)
+    base = _PROJECTION_TIERS.get(position, _PROJECTION_TIERS[Position.WR])[tier]
+    
+    # Add some variance based on rank (±10 points)
+    return float(max(50, base + rank % 20 - 10))
+
 class APIService:
     """Service for handling external API calls"""
     
     def __init__(self):
         # Sleeper API base URL
         self.sleeper_base_url = "https://api.sleeper.app/v1"
+        self.http = get_http_session()
         
-        # Cache file path for Sleeper data
-        self.sleeper_cache_file = "data/sleeper_players_cache.json"
+        # Cache file for Sleeper data: mapped players and name indexes as a
+        # zstd-compressed pickle. The JSON dump is only read to migrate old caches.
+        self.sleeper_cache_file = "data/sleeper_players_cache.pkl.zst"
+        self.sleeper_json_cache_file = "data/sleeper_players_cache.json"
         self.sleeper_cache_timestamp_file = "data/sleeper_cache_timestamp.txt"
-        self._cache_duration = 24 * 60 * 60  # 24 hours in seconds
+        self._cache_duration = int(os.getenv("SLEEPER_CACHE_TTL", 24 * 60 * 60))  # seconds, default 24 hours
         
         # Ensure data directory exists
         os.makedirs("data", exist_ok=True)
         
-        # Initialize cache
-        self._sleeper_players_cache = None
+        # Initialize cache (mapped players keyed by Sleeper player ID)
+        self._sleeper_players: Optional[Dict[str, Player]] = None
         self._sleeper_cache_timestamp = None
-        self._load_sleeper_cache()
+        # ETag of the cached payload, sent back to Sleeper to revalidate an expired cache
+        self._sleeper_cache_etag: Optional[str] = None
+        
+        # Name indexes over the mapped players (rebuilt whenever they are loaded)
+        self._name_to_id: Dict[str, str] = {}
+        self._token_index: Dict[str, Set[str]] = {}
+        # Player ID -> (casefolded full name, alphanumeric search name)
+        self._search_names: Dict[str, Tuple[str, str]] = {}
+        
+        # Enriched trending lists keyed by (trend_type, limit); Sleeper only
+        # updates trends periodically, so these stay valid for a while
+        self._trending_cache = LRUTTLCache(maxsize=8, ttl=15 * 60)
+        
+        # A fresh cache file loads quickly, so only a refresh from the API
+        # (download and parse) runs in the background; readers wait on the event
+        self._sleeper_ready = threading.Event()
+        self.sleeper_warmup_timeout = 120  # seconds
+        # Long-lived instances revalidate an expired cache in the background,
+        # at most once per retry interval while Sleeper is failing
+        self._refresh_lock = threading.Lock()
+        self._next_refresh_attempt = 0.0
+        self.sleeper_refresh_retry = 5 * 60  # seconds
+        if self._sleeper_cache_is_fresh():
+            self._warm_sleeper_cache()
+        else:
+            threading.Thread(target=self._warm_sleeper_cache, name="sleeper-cache-warmup", daemon=True).start()
+
+    def _sleeper_cache_is_fresh(self) -> bool:
+        """Check the binary cache header only, without unpickling the players"""
+        try:
+            with open(self.sleeper_cache_file, 'rb') as f:
+                with zstandard.ZstdDecompressor().stream_reader(f) as reader:
+                    header = pickle.load(reader)
+            return header[0] == SLEEPER_CACHE_VERSION and time.time() - header[1] < self._cache_duration
+        except Exception:
+            return False
+
+    def _warm_sleeper_cache(self):
+        """Load (or fetch) the Sleeper players, then release waiting readers"""
+        try:
+            self._load_sleeper_cache()
+        finally:
+            self._sleeper_ready.set()
+
+    def _wait_for_sleeper_players(self):
+        """Block until the Sleeper cache warmup has finished"""
+        if not self._sleeper_ready.wait(timeout=self.sleeper_warmup_timeout):
+            logger.warning("⏳ Timed out waiting for the Sleeper players cache")
+            return
+        self._refresh_if_expired()
+
+    def _refresh_if_expired(self):
+        """Start a background refresh of an expired cache, serving the loaded players meanwhile"""
+        timestamp = self._sleeper_cache_timestamp
+        if timestamp is None or time.time() - timestamp < self._cache_duration:
+            return
+        with self._refresh_lock:
+            now = time.monotonic()
+            if now < self._next_refresh_attempt:
+                return
+            self._next_refresh_attempt = now + self.sleeper_refresh_retry
+        threading.Thread(target=self._fetch_sleeper_players, name="sleeper-cache-refresh", daemon=True).start()
 
     def _load_sleeper_cache(self):
         """Load Sleeper players cache from file"""
         try:
-            if os.path.exists(self.sleeper_cache_file) and os.path.exists(self.sleeper_cache_timestamp_file):
-                # Load timestamp
-                with open(self.sleeper_cache_timestamp_file, 'r') as f:
-                    timestamp_str = f.read().strip()
-                    self._sleeper_cache_timestamp = float(timestamp_str)
-                
-                # Check if cache is still valid (less than 24 hours old)
-                if time.time() - self._sleeper_cache_timestamp < self._cache_duration:
-                    # Load cached data
-                    with open(self.sleeper_cache_file, 'r') as f:
-                        self._sleeper_players_cache = json.load(f)
-                    logger.info(f"✅ Loaded Sleeper cache from file (age: {time.time() - self._sleeper_cache_timestamp:.0f}s)")
-                    return
-                else:
-                    logger.info("🔄 Sleeper cache expired, will fetch fresh data")
+            # Only use the cache if it is still valid (younger than the cache TTL)
+            if self._read_sleeper_cache(require_fresh=True):
+                logger.info(f"✅ Loaded Sleeper cache from file (age: {time.time() - self._sleeper_cache_timestamp:.0f}s)")
+                return
+            
+            if self._read_legacy_sleeper_cache(require_fresh=True):
+                logger.info("✅ Migrated Sleeper JSON cache to the binary cache format")
+                self._save_sleeper_cache(self._sleeper_cache_timestamp)
+                return
+            
+            # Keep an expired cache loaded so the fetch can revalidate it
+            if self._read_sleeper_cache(require_fresh=False):
+                logger.info("🔄 Sleeper cache expired, revalidating with Sleeper API")
             else:
-                logger.info("🔄 No Sleeper cache found, will fetch fresh data")
+                logger.info("🔄 No valid Sleeper cache found, will fetch fresh data")
                 
         except Exception as e:
             logger.error(f"❌ Error loading Sleeper cache: {e}")
@@ -56,188 +280,301 @@ class APIService:
         # Cache is invalid or doesn't exist, fetch fresh data
         self._fetch_sleeper_players()
 
-    def _save_sleeper_cache(self, players_data: Dict[str, Any]):
-        """Save Sleeper players data to cache file"""
-        try:
-            # Save players data
-            with open(self.sleeper_cache_file, 'w') as f:
-                json.dump(players_data, f)
-            
-            # Save timestamp
-            current_timestamp = time.time()
-            with open(self.sleeper_cache_timestamp_file, 'w') as f:
-                f.write(str(current_timestamp))
+    def _parse_sleeper_players(self, stream) -> Dict[str, Player]:
+        """Stream-parse a Sleeper players JSON object, mapping one entry at a time"""
+        players = {}
+        for player_id, player_data in ijson.kvitems(stream, '', use_float=True):
+            player = _map_sleeper_player(player_id, player_data)
+            if player:
+                players[player_id] = player
+        return players
+
+    @staticmethod
+    def _is_better_ranked(player: Player, other: Player) -> bool:
+        """Whether player has a better (lower, present) rank than other"""
+        return (player.rank or float('inf')) < (other.rank or float('inf'))
+
+    def _set_sleeper_players(self, players: Dict[str, Player]):
+        """Store the mapped Sleeper players and rebuild the name indexes"""
+        name_to_id: Dict[str, str] = {}
+        token_index: Dict[str, Set[str]] = {}
+        search_names: Dict[str, Tuple[str, str]] = {}
+        
+        for player_id, player in players.items():
+            # Normalized once here so lookups never re-lowercase player names
+            full_name = player.name.casefold()
+            search_full_name = "".join(c for c in full_name if c.isalnum())
+            search_names[player_id] = (full_name, search_full_name)
+            tokens = full_name.split()
+            
+            # Full name, Sleeper-style search name and last name; on a collision
+            # keep the best-ranked player
+            for key in (full_name, search_full_name, tokens[-1] if tokens else None):
+                if not key:
+                    continue
+                existing_id = name_to_id.get(key)
+                if existing_id is None or self._is_better_ranked(player, players[existing_id]):
+                    name_to_id[key] = player_id
             
-            self._sleeper_players_cache = players_data
-            self._sleeper_cache_timestamp = current_timestamp
+            for token in tokens:
+                token_index.setdefault(token, set()).add(player_id)
+        
+        self._sleeper_players = players
+        self._name_to_id = name_to_id
+        self._token_index = token_index
+        self._search_names = search_names
+
+    def _find_indexed_player(self, search_name: str) -> Optional[Player]:
+        """Look a casefolded name up in the exact and token indexes"""
+        player_id = self._name_to_id.get(search_name)
+        if player_id is None:
+            player_id = self._name_to_id.get("".join(c for c in search_name if c.isalnum()))
+        if player_id is not None:
+            return self._sleeper_players[player_id]
+        
+        # Players whose name contains every token of the search
+        tokens = search_name.split()
+        if not tokens:
+            return None
+        candidates = None
+        for token in tokens:
+            ids = self._token_index.get(token)
+            if not ids:
+                return None
+            candidates = set(ids) if candidates is None else candidates & ids
+            if not candidates:
+                return None
+        best = None
+        for candidate_id in candidates:
+            player = self._sleeper_players[candidate_id]
+            if best is None or self._is_better_ranked(player, best):
+                best = player
+        return best
+
+    def _read_sleeper_cache(self, require_fresh: bool) -> bool:
+        """Load mapped players and indexes from the binary cache file"""
+        if not os.path.exists(self.sleeper_cache_file):
+            return False
+        
+        with open(self.sleeper_cache_file, 'rb') as f:
+            with zstandard.ZstdDecompressor().stream_reader(f) as reader:
+                # The header is pickled separately so a stale or outdated cache
+                # is rejected without unpickling the players
+                header = pickle.load(reader)
+                if header[0] != SLEEPER_CACHE_VERSION:
+                    logger.info("🔄 Sleeper cache format changed, ignoring cache file")
+                    return False
+                _, timestamp, etag = header
+                if require_fresh and time.time() - timestamp >= self._cache_duration:
+                    logger.info("🔄 Sleeper cache expired")
+                    return False
+                players, name_to_id, token_index, search_names = pickle.load(reader)
+        
+        self._sleeper_players = players
+        self._name_to_id = name_to_id
+        self._token_index = token_index
+        self._search_names = search_names
+        self._sleeper_cache_timestamp = timestamp
+        self._sleeper_cache_etag = etag
+        return True
+
+    def _read_legacy_sleeper_cache(self, require_fresh: bool) -> bool:
+        """Load players from the old JSON cache file (timestamp in a separate file)"""
+        if not os.path.exists(self.sleeper_json_cache_file):
+            return False
+        
+        timestamp = 0.0
+        if os.path.exists(self.sleeper_cache_timestamp_file):
+            with open(self.sleeper_cache_timestamp_file, 'r') as f:
+                timestamp = float(f.read().strip())
+        if require_fresh and time.time() - timestamp >= self._cache_duration:
+            return False
+        
+        with open(self.sleeper_json_cache_file, 'rb') as f:
+            self._set_sleeper_players(self._parse_sleeper_players(f))
+        self._sleeper_cache_timestamp = timestamp
+        return True
+
+    def _save_sleeper_cache(self, timestamp: Optional[float] = None):
+        """Save mapped players and name indexes to the binary cache file"""
+        if timestamp is None:
+            timestamp = time.time()
+        tmp_cache_file = f"{self.sleeper_cache_file}.tmp"
+        try:
+            with open(tmp_cache_file, 'wb') as f:
+                with zstandard.ZstdCompressor().stream_writer(f) as writer:
+                    pickle.dump((SLEEPER_CACHE_VERSION, timestamp, self._sleeper_cache_etag),
+                                writer, protocol=pickle.HIGHEST_PROTOCOL)
+                    pickle.dump((self._sleeper_players, self._name_to_id, self._token_index, self._search_names),
+                                writer, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_cache_file, self.sleeper_cache_file)
+            self._sleeper_cache_timestamp = timestamp
             
-            logger.info(f"✅ Saved Sleeper cache to file ({len(players_data)} players)")
+            logger.info(f"✅ Saved Sleeper cache to file ({len(self._sleeper_players)} players)")
             
         except Exception as e:
             logger.error(f"❌ Error saving Sleeper cache: {e}")
 
+    def _revalidation_headers(self) -> Dict[str, str]:
+        """Conditional request headers for the currently loaded Sleeper cache"""
+        if not self._sleeper_players or self._sleeper_cache_timestamp is None:
+            return {}
+        
+        headers = {"If-Modified-Since": formatdate(self._sleeper_cache_timestamp, usegmt=True)}
+        if self._sleeper_cache_etag:
+            headers["If-None-Match"] = self._sleeper_cache_etag
+        return headers
+
     def _fetch_sleeper_players(self):
         """Fetch all NFL players from Sleeper API"""
         try:
-            print("🔍 DEBUG: Starting Sleeper API fetch...")
             logger.info("📡 Fetching all NFL players from Sleeper API...")
             
             url = f"{self.sleeper_base_url}/players/nfl"
-            print(f"🔍 DEBUG: Fetching from URL: {url}")
+            logger.debug("Fetching Sleeper players from %s", url)
             
-            response = requests.get(url, timeout=60)  # Increased timeout for large file
-            print(f"🔍 DEBUG: Sleeper API response status: {response.status_code}")
+            response = self.http.get(url, headers=self._revalidation_headers(),
+                                     timeout=60, stream=True)  # Increased timeout for large file
+            logger.debug("Sleeper API response status: %s", response.status_code)
+            
+            if response.status_code == 304:
+                # Upstream unchanged: keep the loaded players and restart the TTL
+                self._save_sleeper_cache()
+                logger.info("✅ Sleeper players unchanged, renewed cached data")
+                return
             
             if response.status_code != 200:
                 logger.error(f"Sleeper API error: {response.status_code}")
                 logger.error(f"Sleeper API response: {response.text[:200]}")
-                print(f"❌ DEBUG: Sleeper API failed with status {response.status_code}")
                 return
             
-            players_data = response.json()
-            print(f"🔍 DEBUG: Retrieved {len(players_data)} players from Sleeper API")
-            logger.info(f"✅ Retrieved {len(players_data)} players from Sleeper API")
+            # Parse the body as it downloads
+            response.raw.decode_content = True
+            players = self._parse_sleeper_players(response.raw)
+            self._set_sleeper_players(players)
+            self._sleeper_cache_etag = response.headers.get("ETag")
+            self._save_sleeper_cache()
             
-            # Log sample player data
-            sample_player_id = list(players_data.keys())[0]
-            sample_player = players_data[sample_player_id]
-            print(f"🔍 DEBUG: Sample player data: {sample_player.get('first_name', '')} {sample_player.get('last_name', '')}")
-            print(f"🔍 DEBUG: Sample player search_rank: {sample_player.get('search_rank', 'N/A')}")
-            
-            # Save to cache
-            print("🔍 DEBUG: Saving Sleeper data to cache...")
-            self._save_sleeper_cache(players_data)
-            print("🔍 DEBUG: Sleeper data saved to cache successfully")
+            logger.info(f"✅ Retrieved and cached {len(players)} players from Sleeper API")
             
         except Exception as e:
             logger.error(f"❌ Error fetching Sleeper players: {e}")
-            print(f"❌ DEBUG: Exception in Sleeper fetch: {e}")
             # If fetch fails, try to use existing cache even if expired
-            if os.path.exists(self.sleeper_cache_file):
+            if self._sleeper_players:
+                logger.info(f"🔄 Using expired cache due to API failure ({len(self._sleeper_players)} players)")
+            elif os.path.exists(self.sleeper_cache_file) or os.path.exists(self.sleeper_json_cache_file):
                 try:
-                    with open(self.sleeper_cache_file, 'r') as f:
-                        self._sleeper_players_cache = json.load(f)
-                    logger.info(f"🔄 Using expired cache due to API failure ({len(self._sleeper_players_cache)} players)")
-                    print(f"🔍 DEBUG: Using expired cache with {len(self._sleeper_players_cache)} players")
+                    if self._read_sleeper_cache(require_fresh=False) or self._read_legacy_sleeper_cache(require_fresh=False):
+                        logger.info(f"🔄 Using expired cache due to API failure ({len(self._sleeper_players)} players)")
                 except Exception as cache_error:
                     logger.error(f"❌ Error loading expired cache: {cache_error}")
-                    print(f"❌ DEBUG: Failed to load expired cache: {cache_error}")
 
     def get_sleeper_players(self) -> List[Player]:
         """Get all NFL players from Sleeper API (cached)"""
-        print("🔍 DEBUG: get_sleeper_players() called")
-        
-        if not self._sleeper_players_cache:
-            print("❌ DEBUG: No Sleeper players cache available")
+        self._wait_for_sleeper_players()
+        if not self._sleeper_players:
             logger.warning("❌ No Sleeper players cache available")
             return []
         
-        print(f"🔍 DEBUG: Processing {len(self._sleeper_players_cache)} cached Sleeper players")
-        players = []
-        processed_count = 0
-        
-        for player_id, player_data in self._sleeper_players_cache.items():
-            try:
-                player = self._map_sleeper_player(player_id, player_data)
-                if player:
-                    players.append(player)
-                    processed_count += 1
-                    
-                    # Log first few players for debugging
-                    if processed_count <= 3:
-                        print(f"🔍 DEBUG: Mapped player {processed_count}: {player.name} (rank={player.rank}, adp={player.adp})")
-                        
-            except Exception as e:
-                logger.error(f"❌ Error mapping Sleeper player {player_id}: {e}")
-                print(f"❌ DEBUG: Error mapping player {player_id}: {e}")
-                continue
-        
-        print(f"🔍 DEBUG: Successfully mapped {len(players)} players from Sleeper cache")
-        logger.info(f"✅ Mapped {len(players)} players from Sleeper cache")
+        # Players are mapped once while the cache is parsed
+        players = list(self._sleeper_players.values())
+        logger.debug("Returning %d players from Sleeper cache", len(players))
         return players
 
     def get_sleeper_player_by_name(self, player_name: str) -> Optional[Player]:
         """Get specific player data from Sleeper API by name"""
-        print(f"🔍 DEBUG: get_sleeper_player_by_name() called for: {player_name}")
-        
-        if not self._sleeper_players_cache:
-            print("❌ DEBUG: No Sleeper players cache available")
+        self._wait_for_sleeper_players()
+        if not self._sleeper_players:
             logger.warning("❌ No Sleeper players cache available")
             return None
         
         try:
             logger.info(f"🔍 Searching for player: '{player_name}' in Sleeper API")
             
-            search_name = player_name.lower()
-            print(f"🔍 DEBUG: Searching for '{search_name}' in {len(self._sleeper_players_cache)} players")
+            search_name = player_name.casefold()
+            logger.debug("Searching for %r in %d players", search_name, len(self._sleeper_players))
             
-            # Search through cached players
-            for player_id, player_data in self._sleeper_players_cache.items():
-                try:
-                    # Check various name fields
-                    full_name = f"{player_data.get('first_name', '')} {player_data.get('last_name', '')}".lower()
-                    search_full_name = player_data.get('search_full_name', '').lower()
-                    
-                    if (search_name in full_name or 
-                        full_name in search_name or 
-                        search_name in search_full_name or
-                        any(word in full_name for word in search_name.split())):
-                        
-                        print(f"🔍 DEBUG: Found match: {player_data.get('first_name', '')} {player_data.get('last_name', '')}")
-                        player = self._map_sleeper_player(player_id, player_data)
-                        if player:
-                            print(f"🔍 DEBUG: Successfully mapped player: {player.name} (rank={player.rank}, adp={player.adp})")
-                            logger.info(f"✅ Found player in Sleeper: '{player.name}'")
-                            return player
-                            
-                except Exception as e:
-                    logger.error(f"❌ Error processing Sleeper player {player_id}: {e}")
-                    print(f"❌ DEBUG: Error processing player {player_id}: {e}")
-                    continue
+            # Exact name or token match through the indexes
+            player = self._find_indexed_player(search_name)
+            if player:
+                logger.debug("Found indexed match: %s (rank=%s, adp=%s)", player.name, player.rank, player.adp)
+                logger.info(f"✅ Found player in Sleeper: '{player.name}'")
+                return player
+            
+            # Fall back to a fuzzy substring scan through the normalized names
+            for player_id, names in self._search_names.items():
+                if self._is_fuzzy_name_match(search_name, *names):
+                    player = self._sleeper_players[player_id]
+                    logger.debug("Found fuzzy match: %s (rank=%s, adp=%s)", player.name, player.rank, player.adp)
+                    logger.info(f"✅ Found player in Sleeper: '{player.name}'")
+                    return player
             
-            print(f"❌ DEBUG: No match found for '{player_name}'")
             logger.warning(f"❌ Player not found in Sleeper: '{player_name}'")
             return None
             
         except Exception as e:
             logger.error(f"❌ Error getting Sleeper player by name: {e}")
-            print(f"❌ DEBUG: Exception in get_sleeper_player_by_name: {e}")
             return None
 
-    def get_sleeper_players_by_names(self, player_names: List[str]) -> List[Player]:
-        """Get multiple players from Sleeper API by names"""
-        if not self._sleeper_players_cache:
+    @staticmethod
+    def _is_fuzzy_name_match(search_name: str, full_name: str, search_full_name: str) -> bool:
+        """Loose substring match of a casefolded search name against a player's normalized names"""
+        return (search_name in full_name or
+                full_name in search_name or
+                search_name in search_full_name or
+                any(word in full_name for word in search_name.split()))
+
+    def resolve_sleeper_names(self, player_names: List[str]) -> Dict[str, Player]:
+        """Resolve player names in one pass, keyed by casefolded name (misses omitted)"""
+        self._wait_for_sleeper_players()
+        if not self._sleeper_players:
             logger.warning("❌ No Sleeper players cache available")
-            return []
+            return {}
+        
+        logger.info(f"🔍 Searching for {len(player_names)} players in Sleeper API")
         
+        # Resolve every name through the indexes first
+        search_names = list(dict.fromkeys(name.casefold() for name in player_names))
+        matches: Dict[str, Player] = {}
+        for search_name in search_names:
+            player = self._find_indexed_player(search_name)
+            if player:
+                matches[search_name] = player
+        
+        # One fuzzy scan over the cache for all names the indexes missed
+        unresolved = [name for name in search_names if name not in matches]
+        if unresolved:
+            for player_id, names in self._search_names.items():
+                for search_name in unresolved:
+                    if search_name not in matches and self._is_fuzzy_name_match(search_name, *names):
+                        matches[search_name] = self._sleeper_players[player_id]
+                if len(matches) == len(search_names):
+                    break
+            for search_name in unresolved:
+                if search_name not in matches:
+                    logger.warning(f"❌ No Sleeper data found for: '{search_name}'")
+        
+        logger.info(f"✅ Found {len(matches)} players out of {len(search_names)} requested")
+        return matches
+
+    def get_sleeper_players_by_names(self, player_names: List[str]) -> List[Player]:
+        """Get multiple players from Sleeper API by names"""
         try:
-            logger.info(f"🔍 Searching for {len(player_names)} players in Sleeper API: {player_names}")
-            
-            found_players = []
-            search_names = player_names[:20]  # Limit to first 20 players
-            
-            for player_name in search_names:
-                try:
-                    player = self.get_sleeper_player_by_name(player_name)
-                    if player:
-                        found_players.append(player)
-                        logger.info(f"✅ Added Sleeper player: {player.name} (proj={player.projected_points}, last={player.last_year_points})")
-                    else:
-                        logger.warning(f"❌ No Sleeper data found for: '{player_name}'")
-                        
-                except Exception as e:
-                    logger.error(f"❌ Error getting Sleeper player '{player_name}': {e}")
-                    continue  # Continue with next player instead of failing completely
-            
-            logger.info(f"✅ Found {len(found_players)} players out of {len(search_names)} requested")
-            return found_players
+            matches = self.resolve_sleeper_names(player_names)
+            search_names = dict.fromkeys(name.casefold() for name in player_names)
+            return [matches[name] for name in search_names if name in matches]
             
         except Exception as e:
             logger.error(f"❌ Error getting Sleeper players by names: {e}")
             return []
 
     def get_sleeper_trending_players(self, trend_type: str = "add", limit: int = 25) -> List[Dict[str, Any]]:
-        """Get trending players from Sleeper API"""
+        """Get trending players from Sleeper API (cached briefly)"""
+        cache_key = (trend_type, limit)
+        cached = self._trending_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        
         try:
             logger.info(f"📡 Getting trending {trend_type} players from Sleeper API...")
             
@@ -247,36 +584,42 @@ class APIService:
                 'limit': limit
             }
             
-            response = requests.get(url, params=params, timeout=30)
+            response = self.http.get(url, params=params, timeout=30)
             if response.status_code != 200:
                 logger.error(f"Sleeper trending API error: {response.status_code}")
                 return []
             
-            trending_data = response.json()
+            trending_data = orjson.loads(response.content)
             logger.info(f"✅ Retrieved {len(trending_data)} trending {trend_type} players")
+            self._wait_for_sleeper_players()
             
             # Enrich with player details
             enriched_trending = []
             for trending in trending_data:
                 player_id = trending['player_id']
-                if player_id in self._sleeper_players_cache:
-                    player_data = self._sleeper_players_cache[player_id]
+                player = self._sleeper_players.get(player_id) if self._sleeper_players else None
+                if player:
                     enriched_trending.append({
                         'player_id': player_id,
                         'count': trending['count'],
                         'trend_type': trend_type,
-                        'name': f"{player_data.get('first_name', '')} {player_data.get('last_name', '')}".strip(),
-                        'position': player_data.get('position', ''),
-                        'team': player_data.get('team', 'FA'),
-                        'search_rank': player_data.get('search_rank')
+                        'name': player.name,
+                        'position': player.position.value,
+                        'team': player.team,
+                        'search_rank': player.rank
                     })
             
-            return enriched_trending
+            self._trending_cache.set(cache_key, enriched_trending)
+            return list(enriched_trending)
             
         except Exception as e:
             logger.error(f"❌ Error getting trending players: {e}")
             return []
 
+    def refresh_trending(self):
+        """Drop cached trending lists so the next call hits Sleeper again"""
+        self._trending_cache.clear()
+
     def get_sleeper_trending_adds(self, limit: int = 25) -> List[Dict[str, Any]]:
         """Get trending add players"""
         return self.get_sleeper_trending_players("add", limit)
@@ -285,147 +628,12 @@ class APIService:
         """Get trending drop players"""
         return self.get_sleeper_trending_players("drop", limit)
 
-    def _map_sleeper_player(self, player_id: str, player_data: Dict[str, Any]) -> Optional[Player]:
-        """Map Sleeper API player data to our Player model - using real fantasy data"""
-        try:
-            # Extract basic info
-            first_name = player_data.get('first_name', '')
-            last_name = player_data.get('last_name', '')
-            full_name = f"{first_name} {last_name}".strip()
-            
-            if not full_name:
-                return None
-            
-            # Map position
-            position_str = player_data.get('position', '')
-            position = self._map_sleeper_position(position_str)
-            if not position:
-                return None  # Skip non-fantasy positions
-            
-            # Extract other data with proper None handling
-            team = player_data.get('team', '')
-            if team is None:
-                team = 'FA'  # Free Agent if no team
-            
-            age = player_data.get('age')
-            experience = player_data.get('years_exp')
-            injury_status = player_data.get('injury_status')
-            
-            # Use real Sleeper fantasy data
-            search_rank = player_data.get('search_rank')
-            print(f"🔍 DEBUG: Processing {full_name} - search_rank: {search_rank}")
-            
-            # Convert search_rank to fantasy rank (skip default values)
-            if search_rank and search_rank != 9999999:
-                rank = int(search_rank)
-                print(f"🔍 DEBUG: {full_name} - Using real Sleeper rank: {rank}")
-                
-                # Generate ADP based on rank with some variance
-                adp_variance = (hash(player_id) % 20) - 10  # ±10 picks
-                adp = max(1.0, rank + adp_variance)
-                adp = round(adp, 1)
-                print(f"🔍 DEBUG: {full_name} - Calculated ADP: {adp}")
-                
-                # Calculate value score based on ADP vs rank
-                if adp > 0 and rank > 0:
-                    adp_rank_diff = adp - rank
-                    if adp_rank_diff > 0:
-                        value_score = min(10.0, 7.0 + (adp_rank_diff / 10))
-                    else:
-                        value_score = max(1.0, 7.0 + (adp_rank_diff / 10))
-                else:
-                    value_score = max(1.0, 10.0 - (rank / 30))
-                value_score = round(value_score, 1)
-                print(f"🔍 DEBUG: {full_name} - Calculated value score: {value_score}")
-            else:
-                rank = "N/A"
-                adp = "N/A"
-                value_score = "N/A"
-                print(f"🔍 DEBUG: {full_name} - No valid Sleeper rank, using N/A")
-            
-            # Generate realistic projections based on position and rank
-            if isinstance(rank, int):
-                projected_points = self._generate_projection_from_rank(rank, position)
-                print(f"🔍 DEBUG: {full_name} - Generated projections: proj={projected_points}")
-            else:
-                projected_points = "N/A"
-                print(f"🔍 DEBUG: {full_name} - No projections (no valid rank)")
-            
-            # Create player object with real fantasy data
-            player = Player(
-                id=player_id,
-                name=full_name,
-                position=position,
-                team=team,
-                rank=rank,
-                adp=adp,
-                projected_points=projected_points,
-                value_score=value_score,
-                injury_status=injury_status,
-                bye_week=None,  # Sleeper doesn't provide bye week in basic data
-                age=age,
-                experience=experience
-            )
-            
-            print(f"🔍 DEBUG: Successfully created player: {full_name} (rank={rank}, adp={adp}, proj={projected_points})")
-            return player
-            
-        except Exception as e:
-            logger.error(f"❌ Error mapping Sleeper player {player_id}: {e}")
-            print(f"❌ DEBUG: Error mapping player {player_id}: {e}")
-            return None
-
-    def _map_sleeper_position(self, position_str: str) -> Optional[Position]:
-        """Map Sleeper position to our Position enum"""
-        position_mapping = {
-            'QB': Position.QB,
-            'RB': Position.RB,
-            'WR': Position.WR,
-            'TE': Position.TE,
-            'K': Position.K,
-            'DEF': Position.DEF
-        }
-        return position_mapping.get(position_str) 
-
-    def _generate_projection_from_rank(self, rank: int, position: Position) -> float:
-        """Generate realistic projection based on Sleeper rank and position"""
-        try:
-            # Base projections by position
-            position_bases = {
-                Position.QB: {'top': 350, 'mid': 280, 'bottom': 200},
-                Position.RB: {'top': 280, 'mid': 200, 'bottom': 120},
-                Position.WR: {'top': 220, 'mid': 160, 'bottom': 100},
-                Position.TE: {'top': 150, 'mid': 120, 'bottom': 80},
-                Position.K: {'top': 160, 'mid': 130, 'bottom': 110},
-                Position.DEF: {'top': 140, 'mid': 120, 'bottom': 100}
-            }
-            
-            base = position_bases.get(position, position_bases[Position.WR])
-            
-            # Rank-based projection (lower rank = higher projection)
-            if rank <= 50:
-                projection = base['top']
-            elif rank <= 150:
-                projection = base['mid']
-            else:
-                projection = base['bottom']
-            
-            # Add some variance based on rank
-            variance = (rank % 20) - 10  # ±10 points
-            projection = max(50.0, projection + variance)
-            
-            return round(projection, 1)
-            
-        except Exception as e:
-            logger.error(f"❌ Error generating projection: {e}")
-            return 150.0
-
     def _generate_last_year_from_rank(self, rank: int, position: Position) -> float:
         """Generate realistic last year points based on rank and position"""
         try:
             # Similar to projection but with some variance
-            projected = self._generate_projection_from_rank(rank, position)
-            variance = (hash(str(rank)) % 30) - 15  # ±15 points
+            projected = _generate_projection_from_rank(rank, position)
+            variance = _stable_variance(str(rank), 15)  # ±15 points
             last_year = max(30.0, projected + variance)
             return round(last_year, 1)
             
@@ -1,59 +1,390 @@
 import os
-import json
+import ijson
+import orjson
 import logging
-from typing import List, Dict, Any, Optional
+import random
+import threading
+import time
+from bisect import bisect_right
+from collections import Counter
+from contextlib import contextmanager
+from operator import itemgetter
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import requests
+from pydantic import TypeAdapter
 from bs4 import BeautifulSoup
 
-from app.models.player import Player, PlayerAnalysis, Position
+from app.models.player import Player, PlayerAnalysis, Position, POSITION_LOOKUP
 from app.services.api_service import APIService
 
 logger = logging.getLogger(__name__)
 
+# Player fields copied from upstream data when enriching a cached player
+STAT_FIELDS = ("rank", "adp", "projected_points", "last_year_points", "value_score")
+
+PLAYER_ANALYSIS_LIST_ADAPTER = TypeAdapter(List[PlayerAnalysis])
+
+ALL_POSITIONS = tuple(Position)
+
+# Player analysis rules: (is_strength, predicate, message). Messages are
+# formatted with the player, and each bucket keeps the order listed here.
+ANALYSIS_RULES: Tuple[Tuple[bool, Callable[[Player], Any], str], ...] = (
+    (True, lambda p: p.projected_points and p.last_year_points and p.projected_points > p.last_year_points,
+     "Projected improvement over last year"),
+    (False, lambda p: p.projected_points and p.last_year_points and p.projected_points < p.last_year_points * 0.9,
+     "Projected decline from last year"),
+    (True, lambda p: p.value_score and p.value_score > 8.0, "Excellent value score"),
+    (False, lambda p: p.value_score and p.value_score < 5.0, "Low value score"),
+    (True, lambda p: p.adp and p.rank and p.adp - p.rank > 20,
+     "Significantly undervalued (ADP much higher than rank)"),
+    (False, lambda p: p.adp and p.rank and p.adp - p.rank < -10,
+     "Potentially overvalued (ADP lower than rank)"),
+    (False, lambda p: p.injury_status and p.injury_status != "Healthy", "Injury concern: {player.injury_status}"),
+    (False, lambda p: p.age and p.age > 30, "Age-related risk"),
+)
+
+# Mock projected points range (min, max) by position
+MOCK_PROJECTION_RANGES: Dict[Position, Tuple[int, int]] = {
+    Position.QB: (200, 350),
+    Position.RB: (150, 280),
+    Position.WR: (120, 220),
+    Position.TE: (80, 150),
+    Position.K: (120, 160),
+    Position.DEF: (100, 140),
+}
+
 class PlayerService:
     """Service for managing player data and analysis"""
     
     def __init__(self):
         self.players_cache = {}
+        # Casefolded name -> cached player, maintained alongside players_cache
+        self._by_name_lower: Dict[str, Player] = {}
+        # Guards cache mutations and index rebuilds (syncs run in worker threads)
+        self._lock = threading.RLock()
+        # Serializes snapshot writes, which happen outside _lock so readers
+        # aren't blocked on disk I/O
+        self._save_lock = threading.Lock()
+        self._snapshot_pending = False
         self.player_data_path = "./data/players.json"
+        # The snapshot and journal are only written by this service, so their
+        # players are rebuilt without re-running Pydantic validation
+        self.trust_player_cache = True
+        # Indent the snapshot only in debug mode; compact JSON is faster to write
+        self.pretty_player_data = os.getenv("DEBUG", "False").lower() == "true"
         self.api_service = APIService()
+        
+        # Append-only journal of single-player changes since the last snapshot
+        self.player_journal_path = "./data/players.journal.jsonl"
+        self.journal_compact_threshold = 500
+        self._journal_ops = 0
+        
+        # Inside bulk_update() mutations only mark the cache dirty; one
+        # snapshot is written when the outermost block exits
+        self._bulk_depth = 0
+        self._bulk_dirty = False
+        
+        # Rank-sorted indexes, rebuilt lazily after the cache changes
+        self._rank_sorted: List[Player] = []
+        self._by_position: Dict[Position, List[Player]] = {}
+        # (rank-sorted players, joined names, name offsets), swapped as one unit
+        # so searches never mix a blob with a differently ordered list
+        self._name_index: Tuple[List[Player], str, List[int]] = ([], "", [])
+        self._indexes_dirty = True
+        self._names_dirty = True
+        
+        # JSON-ready player dicts for list endpoints, keyed by player ID
+        self._serialized: Dict[str, Dict[str, Any]] = {}
+        
+        # Mapped Sleeper players keyed by normalized name, refreshed hourly
+        self._sleeper_by_name: Dict[str, Player] = {}
+        self._sleeper_by_name_time = 0.0
+        self.sleeper_bulk_ttl = 60 * 60
+        
         self.load_player_data()
     
     def load_player_data(self):
         """Load player data from file"""
         try:
             if os.path.exists(self.player_data_path):
-                with open(self.player_data_path, 'r') as f:
-                    data = json.load(f)
-                    for player_data in data:
-                        player = Player(**player_data)
+                with open(self.player_data_path, 'rb') as f:
+                    # Stream records so only one raw dict is in memory at a time
+                    for player_data in ijson.items(f, 'item', use_float=True):
+                        player = self._player_from_saved(player_data)
                         self.players_cache[player.id] = player
-                logger.info(f"Loaded {len(self.players_cache)} players from cache")
+            self._replay_journal()
+            self._by_name_lower = {self._name_key(player.name): player for player in self.players_cache.values()}
+            logger.info(f"Loaded {len(self.players_cache)} players from cache")
         except Exception as e:
             logger.error(f"Error loading player data: {e}")
     
-    def save_player_data(self):
-        """Save player data to file"""
+    def _replay_journal(self):
+        """Apply journaled changes on top of the loaded snapshot"""
+        if not os.path.exists(self.player_journal_path):
+            return
+        
+        with open(self.player_journal_path, 'rb') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = orjson.loads(line)
+                    if entry["op"] == "delete":
+                        self.players_cache.pop(entry["id"], None)
+                    else:
+                        player = self._player_from_saved(entry["player"])
+                        self.players_cache[player.id] = player
+                    self._journal_ops += 1
+                except Exception as e:
+                    # A torn last line from an interrupted write is skipped
+                    logger.warning(f"Skipping invalid journal entry: {e}")
+    
+    @contextmanager
+    def bulk_update(self):
+        """Group cache mutations and write a single snapshot when done"""
+        with self._lock:
+            self._bulk_depth += 1
         try:
-            os.makedirs(os.path.dirname(self.player_data_path), exist_ok=True)
-            with open(self.player_data_path, 'w') as f:
-                json.dump([player.dict() for player in self.players_cache.values()], f, indent=2)
-            logger.info(f"Saved {len(self.players_cache)} players to cache")
+            yield self
+        finally:
+            with self._lock:
+                self._bulk_depth -= 1
+                if self._bulk_depth == 0 and self._bulk_dirty:
+                    self._bulk_dirty = False
+                    self._snapshot_pending = True
+            self._save_if_pending()
+    
+    def _persist_change(self, entry: Optional[Dict[str, Any]] = None):
+        """Journal a single change, request a snapshot for a bulk one, or defer inside bulk_update().
+
+        Called under _lock; mutators call _save_if_pending() once they release it.
+        """
+        if self._bulk_depth:
+            self._bulk_dirty = True
+        elif entry is not None:
+            self._append_journal(entry)
+        else:
+            self._snapshot_pending = True
+    
+    def _save_if_pending(self):
+        """Write the snapshot requested by a mutation (call without holding _lock)"""
+        if self._snapshot_pending:
+            self.save_player_data()
+    
+    def _append_journal(self, entry: Dict[str, Any]):
+        """Append a single change to the journal, compacting when it grows"""
+        try:
+            os.makedirs(os.path.dirname(self.player_journal_path), exist_ok=True)
+            with open(self.player_journal_path, 'ab') as f:
+                f.write(orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE))
+            self._journal_ops += 1
+            
+            if self._journal_ops >= self.journal_compact_threshold:
+                self._snapshot_pending = True
         except Exception as e:
-            logger.error(f"Error saving player data: {e}")
+            logger.error(f"Error writing player journal: {e}")
+    
+    def save_player_data(self):
+        """Save a full snapshot of player data to file and drop the journaled changes it covers.
+
+        Only copying the cache happens under _lock; the write itself doesn't
+        block readers. Must not be called while holding _lock.
+        """
+        with self._save_lock:
+            try:
+                # Players are immutable, so a shallow copy is a consistent snapshot
+                with self._lock:
+                    self._snapshot_pending = False
+                    players = list(self.players_cache.values())
+                    journal_offset = self._journal_size()
+                    journal_ops = self._journal_ops
+                
+                os.makedirs(os.path.dirname(self.player_data_path), exist_ok=True)
+                tmp_path = f"{self.player_data_path}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    option = orjson.OPT_INDENT_2 if self.pretty_player_data else 0
+                    f.write(orjson.dumps([player.model_dump() for player in players], option=option))
+                os.replace(tmp_path, self.player_data_path)
+                
+                # The snapshot contains every change journaled before it was taken
+                with self._lock:
+                    self._trim_journal(journal_offset)
+                    self._journal_ops = max(0, self._journal_ops - journal_ops)
+                logger.info(f"Saved {len(players)} players to cache")
+            except Exception as e:
+                logger.error(f"Error saving player data: {e}")
+    
+    def _journal_size(self) -> int:
+        try:
+            return os.path.getsize(self.player_journal_path)
+        except OSError:
+            return 0
+    
+    def _trim_journal(self, offset: int):
+        """Drop the first offset bytes of the journal, keeping entries appended after them"""
+        if not os.path.exists(self.player_journal_path):
+            return
+        with open(self.player_journal_path, 'rb') as f:
+            f.seek(offset)
+            tail = f.read()
+        if not tail:
+            os.remove(self.player_journal_path)
+            return
+        tmp_path = f"{self.player_journal_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(tail)
+        os.replace(tmp_path, self.player_journal_path)
+    
+    @staticmethod
+    def _clean_stat_fields(player_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop legacy "N/A" stat strings from saved data before validation"""
+        for field in STAT_FIELDS:
+            if isinstance(player_data.get(field), str):
+                player_data[field] = None
+        return player_data
+    
+    def _player_from_saved(self, player_data: Dict[str, Any]) -> Player:
+        """Build a Player from saved data, skipping validation for trusted files"""
+        player_data = self._clean_stat_fields(player_data)
+        if self.trust_player_cache:
+            position = POSITION_LOOKUP.get(player_data.get("position"))
+            if position is not None:
+                player_data["position"] = position
+                return Player.model_construct(**player_data)
+        return Player(**player_data)
+    
+    @staticmethod
+    def _name_key(name: str) -> str:
+        """Normalized name used by every name index (case-insensitive, Unicode-aware)"""
+        return name.casefold()
+    
+    @staticmethod
+    def _rank_key(player: Player) -> float:
+        """Sort key for rank (lower is better, missing ranks last)"""
+        return player.rank or float('inf')
+    
+    def _invalidate_indexes(self):
+        """Mark the rank-sorted indexes as stale"""
+        self._indexes_dirty = True
+        self._serialized.clear()
+    
+    def _ensure_indexes(self):
+        """Rebuild the rank-sorted indexes if the cache changed"""
+        if not self._indexes_dirty:
+            return
+        with self._lock:
+            self._rebuild_indexes()
+    
+    def _ensure_name_index(self):
+        """Rebuild the indexes and the joined name blob if either is stale"""
+        self._ensure_indexes()
+        if not self._names_dirty:
+            return
+        with self._lock:
+            self._rebuild_name_index()
+    
+    def _rebuild_indexes(self):
+        """Rebuild the rank-sorted indexes from the cache"""
+        self._rank_sorted = sorted(self.players_cache.values(), key=self._rank_key)
+        
+        by_position = {pos: [] for pos in ALL_POSITIONS}
+        for player in self._rank_sorted:
+            by_position.setdefault(player.position, []).append(player)
+        self._by_position = by_position
+        self._indexes_dirty = False
+        self._names_dirty = True
+    
+    def _rebuild_name_index(self):
+        """Join normalized names in rank order, with the start offset of each name"""
+        ranked = self._rank_sorted
+        names_lower = [self._name_key(player.name) for player in ranked]
+        offsets = []
+        position = 0
+        for player_name in names_lower:
+            offsets.append(position)
+            position += len(player_name) + 1
+        self._name_index = (ranked, "\n".join(names_lower), offsets)
+        self._names_dirty = False
+    
+    def _insort_by_rank(self, players: List[Player], player: Player):
+        """Insert player into a rank-sorted list, after players with the same rank"""
+        key = self._rank_key(player)
+        low, high = 0, len(players)
+        while low < high:
+            middle = (low + high) // 2
+            if self._rank_key(players[middle]) <= key:
+                low = middle + 1
+            else:
+                high = middle
+        players.insert(low, player)
+    
+    @staticmethod
+    def _remove_instance(players: List[Player], player: Player):
+        """Remove this exact player instance from a list (not an equal copy)"""
+        for index, candidate in enumerate(players):
+            if candidate is player:
+                del players[index]
+                return
+    
+    def _update_indexes(self, previous: Optional[Player], player: Optional[Player]):
+        """Apply a single player change to the rank-sorted indexes.
+
+        Builds updated copies and swaps them in, so lock-free readers only
+        ever see complete lists.
+        """
+        self._serialized.pop((player or previous).id, None)
+        self._names_dirty = True
+        if self._indexes_dirty:
+            return
+        ranked = list(self._rank_sorted)
+        by_position = dict(self._by_position)
+        for position in {p.position for p in (previous, player) if p is not None}:
+            by_position[position] = list(by_position.get(position, []))
+        if previous is not None:
+            self._remove_instance(ranked, previous)
+            self._remove_instance(by_position[previous.position], previous)
+        if player is not None:
+            self._insort_by_rank(ranked, player)
+            self._insort_by_rank(by_position[player.position], player)
+        self._rank_sorted = ranked
+        self._by_position = by_position
+    
+    def serialize_players(self, players: List[Player]) -> List[Dict[str, Any]]:
+        """Get JSON-ready dicts for players, reusing cached dumps"""
+        serialized = self._serialized
+        result = []
+        for player in players:
+            # Only reuse dumps for the exact instance held in the cache
+            is_cached = self.players_cache.get(player.id) is player
+            data = serialized.get(player.id) if is_cached else None
+            if data is None:
+                data = player.model_dump(mode="json")
+                if is_cached:
+                    serialized[player.id] = data
+            result.append(data)
+        return result
     
     def get_player_by_id(self, player_id: str) -> Optional[Player]:
         """Get player by ID"""
         return self.players_cache.get(player_id)
     
+    def get_players_by_ids(self, player_ids: List[str]) -> List[Player]:
+        """Get cached players by ID, skipping unknown IDs"""
+        players = map(self.players_cache.get, player_ids)
+        return [player for player in players if player is not None]
+    
     def get_player_by_name(self, player_name: str) -> Optional[Player]:
-        """Get player data by name from Sleeper API"""
+        """Get player data by name from the local cache, falling back to Sleeper API"""
         try:
+            player = self._by_name_lower.get(self._name_key(player_name))
+            if player:
+                return player
+            
             logger.info(f"🔍 PlayerService: Getting player by name: '{player_name}'")
             
-            api_service = APIService()
-            player = api_service.get_sleeper_player_by_name(player_name)
+            player = self.api_service.get_sleeper_player_by_name(player_name)
             
             if player:
                 logger.info(f"✅ PlayerService: Found player '{player.name}' in Sleeper API")
@@ -71,8 +402,7 @@ class PlayerService:
         try:
             logger.info("🔍 PlayerService: Getting all players from Sleeper API")
             
-            api_service = APIService()
-            players = api_service.get_sleeper_players()
+            players = self.api_service.get_sleeper_players()
             
             logger.info(f"✅ PlayerService: Retrieved {len(players)} players from Sleeper API")
             return players
@@ -81,31 +411,87 @@ class PlayerService:
             logger.error(f"❌ PlayerService: Error getting all players: {e}")
             return []
     
-    def get_players_by_position(self, position: Position) -> List[Player]:
-        """Get all players by position"""
-        return [player for player in self.players_cache.values() if player.position == position]
+    def get_players_by_position(self, position: Position, limit: Optional[int] = None) -> List[Player]:
+        """Get players by position, best rank first"""
+        self._ensure_indexes()
+        players = self._by_position.get(position, [])
+        return players[:limit] if limit is not None else list(players)
     
     def get_top_players(self, position: Optional[Position] = None, limit: int = 50) -> List[Player]:
         """Get top players by rank"""
-        players = self.players_cache.values()
+        self._ensure_indexes()
         
         if position:
-            players = [p for p in players if p.position == position]
+            return self._by_position.get(position, [])[:limit]
+        return self._rank_sorted[:limit]
+    
+    def get_position_counts(self) -> Dict[str, int]:
+        """Get count of players by position"""
+        self._ensure_indexes()
+        return {pos.value: len(players) for pos, players in self._by_position.items() if players}
+    
+    def search_players(self, name: str, limit: int = 10) -> List[Player]:
+        """Search players by name (case-insensitive), best ranked first"""
+        self._ensure_name_index()
+        search_name = self._name_key(name)
+        if not search_name:
+            return self._rank_sorted[:limit]
+        if "\n" in search_name:
+            return []
         
-        # Sort by rank (lower is better)
-        sorted_players = sorted(players, key=lambda p: p.rank or float('inf'))
-        return sorted_players[:limit]
+        # Scan the joined name blob with str.find instead of testing each name
+        ranked, blob, offsets = self._name_index
+        matching_players = []
+        match = blob.find(search_name)
+        while match != -1 and len(matching_players) < limit:
+            index = bisect_right(offsets, match) - 1
+            matching_players.append(ranked[index])
+            if index + 1 >= len(offsets):
+                break
+            match = blob.find(search_name, offsets[index + 1])
+        return matching_players
+    
+    def _store_player(self, player: Player) -> Optional[Player]:
+        """Put player in the cache and the name index, returning the player it replaced"""
+        previous = self.players_cache.get(player.id)
+        if previous is not None and previous.name != player.name:
+            previous_key = self._name_key(previous.name)
+            if self._by_name_lower.get(previous_key) is previous:
+                del self._by_name_lower[previous_key]
+        self.players_cache[player.id] = player
+        self._by_name_lower[self._name_key(player.name)] = player
+        return previous
     
     def add_player(self, player: Player):
         """Add or update player in cache"""
-        self.players_cache[player.id] = player
-        self.save_player_data()
+        with self._lock:
+            previous = self._store_player(player)
+            self._update_indexes(previous, player)
+            self._persist_change({"op": "upsert", "player": player.model_dump()})
+        self._save_if_pending()
     
     def add_players(self, players: List[Player]):
         """Add multiple players to cache"""
-        for player in players:
-            self.players_cache[player.id] = player
-        self.save_player_data()
+        with self._lock:
+            for player in players:
+                self._store_player(player)
+            self._invalidate_indexes()
+            self._persist_change()
+        self._save_if_pending()
+    
+    def delete_player(self, player_id: str) -> bool:
+        """Remove player from cache"""
+        with self._lock:
+            player = self.players_cache.pop(player_id, None)
+            if player is None:
+                return False
+            name_key = self._name_key(player.name)
+            if self._by_name_lower.get(name_key) is player:
+                del self._by_name_lower[name_key]
+            self._update_indexes(player, None)
+            self._persist_change({"op": "delete", "id": player_id})
+        self._save_if_pending()
+        return True
     
     def enrich_player_with_api_data(self, player: Player, source: str = "sleeper") -> Player:
         """Enrich player data with real API data - Sleeper as primary source"""
@@ -133,15 +519,95 @@ class PlayerService:
             logger.error(f"Error enriching player {player.name}: {e}")
             return player
     
-    def get_enriched_players(self, players: List[Player], source: str = "espn") -> List[Player]:
-        """Enrich a list of players with API data - ESPN as primary source"""
-        enriched_players = []
-        
+    def get_sleeper_bulk_players(self) -> Dict[str, Player]:
+        """Get all Sleeper players keyed by normalized name (cached)"""
+        if not self._sleeper_by_name or time.monotonic() - self._sleeper_by_name_time >= self.sleeper_bulk_ttl:
+            self._set_sleeper_bulk_players(self.api_service.get_sleeper_players())
+        return self._sleeper_by_name
+    
+    def _set_sleeper_bulk_players(self, players: List[Player]):
+        """Index freshly mapped Sleeper players by normalized name"""
+        by_name = {}
         for player in players:
-            enriched_player = self.enrich_player_with_api_data(player, source)
-            enriched_players.append(enriched_player)
+            # Keep the best ranked player when names collide
+            name_key = self._name_key(player.name)
+            existing = by_name.get(name_key)
+            if existing is None or self._rank_key(player) < self._rank_key(existing):
+                by_name[name_key] = player
+        self._sleeper_by_name = by_name
+        self._sleeper_by_name_time = time.monotonic()
+    
+    def enrich_players_by_names(self, player_names: List[str]) -> List[Player]:
+        """Resolve player names against the local cache, enriching from one bulk Sleeper lookup.
+
+        Cached players that already have stats are returned as-is; the rest
+        (and cache misses) are replaced by the Sleeper player when it has stats.
+        """
+        found_players = []
+        with_stats = []
+        bulk_players = None
+        for name in player_names:
+            name_key = self._name_key(name)
+            cached_player = self._by_name_lower.get(name_key)
+            if cached_player and cached_player.projected_points and cached_player.last_year_points:
+                found_players.append(cached_player)
+                continue
+            
+            if bulk_players is None:
+                bulk_players = self.get_sleeper_bulk_players()
+            upstream = bulk_players.get(name_key)
+            if upstream is None:
+                # Fall back to the fuzzy name match for nicknames and partial names
+                upstream = self.api_service.get_sleeper_player_by_name(name)
+            
+            if upstream and (upstream.projected_points or upstream.last_year_points):
+                found_players.append(upstream)
+                with_stats.append(upstream)
+            elif cached_player or upstream:
+                found_players.append(cached_player or upstream)
         
-        return enriched_players
+        if with_stats:
+            self.add_players(with_stats)
+        
+        return found_players
+    
+    def get_enriched_players(self, players: List[Player], source: str = "espn") -> List[Player]:
+        """Enrich a list of players with API data, resolving all Sleeper names in one batch"""
+        try:
+            # Cached players that already have stats are used as-is
+            enriched_players: List[Optional[Player]] = []
+            missing_names = []
+            for player in players:
+                cached_player = self._by_name_lower.get(self._name_key(player.name))
+                if cached_player and cached_player.projected_points and cached_player.last_year_points:
+                    enriched_players.append(cached_player)
+                else:
+                    enriched_players.append(None)
+                    missing_names.append(player.name)
+            
+            if not missing_names:
+                return enriched_players
+            
+            logger.info(f"🔍 Enriching {len(missing_names)} players with Sleeper data")
+            upstream_by_name = self.api_service.resolve_sleeper_names(missing_names)
+            
+            # Players found upstream are cached as they go; write them out once
+            with self.bulk_update():
+                for index, player in enumerate(players):
+                    if enriched_players[index] is not None:
+                        continue
+                    upstream = upstream_by_name.get(self._name_key(player.name))
+                    if upstream and (upstream.projected_points or upstream.last_year_points):
+                        self.add_player(upstream)
+                        enriched_players[index] = upstream
+                    else:
+                        enriched_players[index] = player
+            
+            return enriched_players
+            
+        except Exception as e:
+            logger.error(f"Error enriching players: {e}")
+            return list(players)
     
     def sync_with_sleeper_api(self) -> List[Player]:
         """Sync player data with Sleeper API"""
@@ -159,44 +625,61 @@ class PlayerService:
             logger.error(f"Error syncing with Sleeper API: {e}")
             return []
     
+    def sync_and_enrich_with_sleeper_api(self) -> Tuple[List[Player], int]:
+        """Sync with Sleeper and enrich cached players missing stats from the same fetch"""
+        try:
+            logger.info("Syncing with Sleeper API...")
+            players = self.api_service.get_sleeper_players()
+            if not players:
+                return [], 0
+            
+            self._set_sleeper_bulk_players(players)
+            upstream_by_name = self._sleeper_by_name
+            
+            with self._lock:
+                # Single pass: merge fetched stats into existing players missing them
+                merged_players = []
+                for player in self.players_cache.values():
+                    if player.projected_points and player.last_year_points:
+                        continue
+                    upstream = upstream_by_name.get(self._name_key(player.name))
+                    if not upstream or upstream.id == player.id:
+                        continue
+                    if upstream.projected_points or upstream.last_year_points:
+                        stats = {field: getattr(upstream, field) for field in STAT_FIELDS
+                                 if getattr(upstream, field) is not None}
+                        merged_players.append(player.model_copy(update=stats))
+            
+            # Outside the lock: add_players writes the snapshot
+            self.add_players(players + merged_players)
+            enriched_count = len(merged_players)
+            
+            logger.info(f"Synced {len(players)} players from Sleeper")
+            return players, enriched_count
+            
+        except Exception as e:
+            logger.error(f"Error syncing with Sleeper API: {e}")
+            return [], 0
+    
     def get_player_analysis(self, player_id: str) -> Optional[PlayerAnalysis]:
         """Get detailed analysis for a specific player"""
+        player = self.get_player_by_id(player_id)
+        if not player:
+            return None
+        
+        # Enrich player data if needed
+        return self._analyze_player(self.enrich_player_with_api_data(player))
+    
+    def _analyze_player(self, player: Player) -> Optional[PlayerAnalysis]:
+        """Build the strengths/weaknesses analysis for an (enriched) player"""
         try:
-            player = self.get_player_by_id(player_id)
-            if not player:
-                return None
-            
-            # Enrich player data if needed
-            player = self.enrich_player_with_api_data(player)
-            
             strengths = []
             weaknesses = []
             
             # Analyze based on available data
-            if player.projected_points and player.last_year_points:
-                if player.projected_points > player.last_year_points:
-                    strengths.append("Projected improvement over last year")
-                elif player.projected_points < player.last_year_points * 0.9:
-                    weaknesses.append("Projected decline from last year")
-            
-            if player.value_score:
-                if player.value_score > 8.0:
-                    strengths.append("Excellent value score")
-                elif player.value_score < 5.0:
-                    weaknesses.append("Low value score")
-            
-            if player.adp and player.rank:
-                adp_rank_diff = player.adp - player.rank
-                if adp_rank_diff > 20:
-                    strengths.append("Significantly undervalued (ADP much higher than rank)")
-                elif adp_rank_diff < -10:
-                    weaknesses.append("Potentially overvalued (ADP lower than rank)")
-            
-            if player.injury_status and player.injury_status != "Healthy":
-                weaknesses.append(f"Injury concern: {player.injury_status}")
-            
-            if player.age and player.age > 30:
-                weaknesses.append("Age-related risk")
+            for is_strength, applies, message in ANALYSIS_RULES:
+                if applies(player):
+                    (strengths if is_strength else weaknesses).append(message.format(player=player))
             
             # Generate outlook
             if len(strengths) > len(weaknesses):
@@ -236,61 +719,58 @@ class PlayerService:
             logger.error(f"Error getting player analysis: {e}")
             return None
     
+    @staticmethod
+    def _adp_rank_diff(player: Player) -> Optional[float]:
+        """ADP minus rank, or None if either is missing"""
+        if player.adp and player.rank:
+            return player.adp - player.rank
+        return None
+    
     def get_positional_scarcity(self, available_players: List[Player]) -> Dict[str, str]:
         """Analyze positional scarcity in available players"""
-        position_counts = {}
-        for player in available_players:
-            pos = player.position
-            position_counts[pos] = position_counts.get(pos, 0) + 1
-        
-        scarcity = {}
-        for pos in Position:
-            count = position_counts.get(pos, 0)
-            if count <= 5:
-                scarcity[pos] = "High"
-            elif count <= 15:
-                scarcity[pos] = "Medium"
-            else:
-                scarcity[pos] = "Low"
-        
-        return scarcity
+        position_counts = Counter(player.position for player in available_players)
+        return {pos: self._scarcity_level(position_counts[pos]) for pos in ALL_POSITIONS}
+    
+    @staticmethod
+    def _scarcity_level(count: int) -> str:
+        """Scarcity label for the number of available players at a position"""
+        if count <= 5:
+            return "High"
+        if count <= 15:
+            return "Medium"
+        return "Low"
     
     def get_value_opportunities(self, available_players: List[Player]) -> List[Player]:
         """Find players with good value (ADP significantly higher than rank)"""
         value_players = []
         
         for player in available_players:
-            if player.adp and player.rank:
-                adp_rank_diff = player.adp - player.rank
-                if adp_rank_diff > 20:  # ADP 20+ spots higher than rank
-                    value_players.append(player)
+            adp_rank_diff = self._adp_rank_diff(player)
+            if adp_rank_diff is not None and adp_rank_diff > 20:  # ADP 20+ spots higher than rank
+                value_players.append((adp_rank_diff, player))
         
-        # Sort by value (biggest difference first)
-        value_players.sort(key=lambda p: p.adp - p.rank, reverse=True)
-        return value_players
+        # Sort by value (biggest difference first), reusing the computed differences
+        value_players.sort(key=itemgetter(0), reverse=True)
+        return [player for _, player in value_players]
     
     def get_risk_players(self, available_players: List[Player]) -> List[Player]:
         """Find players with risk factors"""
         risk_players = []
         
         for player in available_players:
-            risk_factors = []
-            
             # Injury risk
             if player.injury_status and player.injury_status != "Healthy":
-                risk_factors.append("Injury")
+                risk_players.append(player)
+                continue
             
             # Age risk
             if player.age and player.age > 30:
-                risk_factors.append("Age")
+                risk_players.append(player)
+                continue
             
             # ADP vs rank risk (overvalued)
-            if player.adp and player.rank:
-                adp_rank_diff = player.adp - player.rank
-                if adp_rank_diff < -10:
-                    risk_factors.append("Overvalued")
-            
-            if risk_factors:
+            adp_rank_diff = self._adp_rank_diff(player)
+            if adp_rank_diff is not None and adp_rank_diff < -10:
                 risk_players.append(player)
         
         return risk_players
@@ -322,34 +802,34 @@ class PlayerService:
             logger.error(f"Error updating player rankings: {e}")
     
     def get_player_comparison(self, player_ids: List[str]) -> List[PlayerAnalysis]:
-        """Compare multiple players"""
-        comparisons = []
-        for player_id in player_ids:
-            analysis = self.get_player_analysis(player_id)
-            if analysis:
-                comparisons.append(analysis)
-        return comparisons 
+        """Compare multiple players, enriching them all in one batch"""
+        players = self.get_enriched_players(self.get_players_by_ids(player_ids))
+        analyses = map(self._analyze_player, players)
+        return [analysis for analysis in analyses if analysis]
+    
+    def get_player_comparison_dicts(self, player_ids: List[str]) -> List[Dict[str, Any]]:
+        """Compare multiple players, dumped to plain dicts in one pass"""
+        return PLAYER_ANALYSIS_LIST_ADAPTER.dump_python(self.get_player_comparison(player_ids))
     
     def populate_mock_data(self):
         """Populate mock data for players missing stats"""
         try:
-            updated_count = 0
+            updated_players = []
             
-            for player in self.players_cache.values():
+            # Copy under the lock; a sync thread may be mutating the cache
+            with self._lock:
+                players = list(self.players_cache.values())
+            for player in players:
                 if not player.projected_points or not player.last_year_points:
                     # Generate mock data based on position and experience
                     mock_data = self._generate_mock_stats(player)
                     
                     # Update player with mock data
-                    player_dict = player.dict()
-                    player_dict.update(mock_data)
-                    
-                    updated_player = Player(**player_dict)
-                    self.players_cache[player.id] = updated_player
-                    updated_count += 1
+                    updated_players.append(player.model_copy(update=mock_data))
             
-            # Save updated data
-            self.save_player_data()
+            # Store and save the updated players in one write
+            self.add_players(updated_players)
+            updated_count = len(updated_players)
             logger.info(f"Populated mock data for {updated_count} players")
             return updated_count
             
@@ -359,22 +839,10 @@ class PlayerService:
     
     def _generate_mock_stats(self, player: Player) -> Dict[str, Any]:
         """Generate realistic mock stats based on player position and experience"""
-        import random
-        
-        # Base stats by position
-        position_stats = {
-            "QB": {"min_proj": 200, "max_proj": 350, "min_last": 180, "max_last": 320},
-            "RB": {"min_proj": 150, "max_proj": 280, "min_last": 130, "max_last": 260},
-            "WR": {"min_proj": 120, "max_proj": 220, "min_last": 100, "max_last": 200},
-            "TE": {"min_proj": 80, "max_proj": 150, "min_last": 70, "max_last": 140},
-            "K": {"min_proj": 120, "max_proj": 160, "min_last": 110, "max_last": 150},
-            "DEF": {"min_proj": 100, "max_proj": 140, "min_last": 90, "max_last": 130}
-        }
-        
-        stats = position_stats.get(player.position, position_stats["WR"])
+        min_proj, max_proj = MOCK_PROJECTION_RANGES.get(player.position, MOCK_PROJECTION_RANGES[Position.WR])
         
         # Generate projected points
-        projected_points = random.uniform(stats["min_proj"], stats["max_proj"])
+        projected_points = random.uniform(min_proj, max_proj)
         
         # Generate last year points (slightly lower for rookies, higher for veterans)
         experience_factor = min(player.experience or 1, 8) / 8.0
@@ -400,108 +868,60 @@ class PlayerService:
     def enrich_recommendation_players(self, available_players: List[Player]) -> List[Player]:
         """Enrich players used in recommendations with Sleeper data only"""
         try:
-            print("🔍 DEBUG: enrich_recommendation_players() called")
-            player_names = [player.name for player in available_players if player.name]
-            if not player_names:
-                logger.warning(f"⚠️ PlayerService: No player names found in available players")
-                print("❌ DEBUG: No player names found")
+            if not any(player.name for player in available_players):
+                logger.warning("⚠️ PlayerService: No player names found in available players")
                 return available_players
 
-            print(f"🔍 DEBUG: Enriching {len(player_names)} players: {player_names[:3]}...")
-            logger.info(f"🔍 PlayerService: Enriching {len(player_names)} recommendation players with Sleeper data only")
+            logger.info("🔍 PlayerService: Enriching %d recommendation players with Sleeper data only",
+                        len(available_players))
 
-            # Get Sleeper players by names
-            api_service = APIService()
-            print("🔍 DEBUG: Calling Sleeper API for player data...")
-            sleeper_players = api_service.get_sleeper_players_by_names(player_names)
-            print(f"🔍 DEBUG: Retrieved {len(sleeper_players)} players from Sleeper API")
-            
-            # Create lookup for Sleeper players
-            sleeper_lookup = {player.name.lower(): player for player in sleeper_players}
-            print(f"🔍 DEBUG: Created lookup with {len(sleeper_lookup)} Sleeper players")
+            # One bulk lookup of all Sleeper players keyed by normalized name
+            # (mapped once and cached) instead of a name scan per player
+            sleeper_lookup = self.get_sleeper_bulk_players()
+            debug_enabled = logger.isEnabledFor(logging.DEBUG)
             
             enriched_players = []
+            found_count = 0
             
             for player in available_players:
-                print(f"🔍 DEBUG: Processing player: {player.name}")
-                logger.info(f"🔍 Processing recommendation player: {player.name}")
-                
                 # Try to find Sleeper data for this player
-                sleeper_player = sleeper_lookup.get(player.name.lower())
+                sleeper_player = sleeper_lookup.get(self._name_key(player.name))
                 
                 if sleeper_player:
-                    print(f"🔍 DEBUG: Found Sleeper data for {player.name}")
                     # Prioritize scraped data over Sleeper API data
                     # Use scraped projected_points if available, otherwise use Sleeper
-                    projected_points = player.projected_points if player.projected_points and player.projected_points != "N/A" else sleeper_player.projected_points
+                    projected_points = player.projected_points or sleeper_player.projected_points
                     
-                    # Use real Sleeper data for other fields
-                    enriched_player = Player(
-                        id=player.id,
-                        name=player.name,
-                        position=player.position,
-                        team=player.team,
-                        rank=sleeper_player.rank,
-                        adp=sleeper_player.adp,
-                        projected_points=projected_points,  # Prioritize scraped data
-                        value_score=sleeper_player.value_score,
-                        injury_status=sleeper_player.injury_status,
-                        bye_week=player.bye_week,  # Keep scraped bye week
-                        age=sleeper_player.age,
-                        experience=sleeper_player.experience
-                    )
-                    print(f"🔍 DEBUG: Enriched {player.name} with data: rank={sleeper_player.rank}, adp={sleeper_player.adp}, proj={projected_points} (scraped: {player.projected_points})")
-                    logger.info(f"✅ Found real Sleeper data for {player.name}")
+                    # Use real Sleeper data for other fields; identity, team and
+                    # bye week stay scraped. Copying skips re-validation.
+                    enriched_player = player.model_copy(update={
+                        'rank': sleeper_player.rank,
+                        'adp': sleeper_player.adp,
+                        'projected_points': projected_points,  # Prioritize scraped data
+                        'value_score': sleeper_player.value_score,
+                        'injury_status': sleeper_player.injury_status,
+                        'age': sleeper_player.age,
+                        'experience': sleeper_player.experience
+                    })
+                    found_count += 1
+                    if debug_enabled:
+                        logger.debug("Enriched %s: rank=%s, adp=%s, proj=%s (scraped: %s)", player.name,
+                                     sleeper_player.rank, sleeper_player.adp, projected_points, player.projected_points)
                 else:
-                    print(f"🔍 DEBUG: No Sleeper data found for {player.name}, keeping scraped data")
                     # Keep the scraped data as-is
-                    enriched_player = Player(
-                        id=player.id,
-                        name=player.name,
-                        position=player.position,
-                        team=player.team,
-                        rank=player.rank,
-                        adp=player.adp,
-                        projected_points=player.projected_points,  # Keep scraped projected points
-                        value_score=player.value_score,
-                        injury_status=player.injury_status,
-                        bye_week=player.bye_week,
-                        age=player.age,
-                        experience=player.experience
-                    )
-                    logger.info(f"❌ No Sleeper data found for {player.name}, keeping scraped data")
+                    enriched_player = player
+                    if debug_enabled:
+                        logger.debug("No Sleeper data found for %s, keeping scraped data", player.name)
                 
                 enriched_players.append(enriched_player)
 
-            print(f"🔍 DEBUG: Enrichment complete. {len(enriched_players)} players processed")
-            logger.info(f"✅ PlayerService: Enriched {len(enriched_players)} recommendation players with real Sleeper data only")
+            logger.info("✅ PlayerService: Enriched %d of %d recommendation players with real Sleeper data",
+                        found_count, len(enriched_players))
             return enriched_players
 
-        except Exception as e:
-            logger.error(f"❌ PlayerService: Error enriching recommendation players: {e}")
-            print(f"❌ DEBUG: Exception in enrich_recommendation_players: {e}")
-            import traceback
-            logger.error(f"Stack trace: {traceback.format_exc()}")
+        except Exception:
+            logger.exception("❌ PlayerService: Error enriching recommendation players")
 
             # Return original players with scraped data if enrichment fails completely
-            fallback_players = []
-            for player in available_players:
-                fallback_player = Player(
-                    id=player.id,
-                    name=player.name,
-                    position=player.position,
-                    team=player.team,
-                    rank=player.rank,
-                    adp=player.adp,
-                    projected_points=player.projected_points,  # Keep scraped projected points
-                    value_score=player.value_score,
-                    injury_status=player.injury_status,
-                    bye_week=player.bye_week,
-                    age=player.age,
-                    experience=player.experience
-                )
-                fallback_players.append(fallback_player)
-
-            print(f"🔍 DEBUG: Using fallback with {len(fallback_players)} players (keeping scraped data)")
-            logger.info(f"🔄 Returning {len(fallback_players)} players with scraped data due to enrichment failure")
-            return fallback_players 
\ No newline at end of file
+            logger.info("🔄 Returning %d players with scraped data due to enrichment failure", len(available_players))
+            return list(available_players)
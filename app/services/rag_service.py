@@ -1,71 +1,127 @@
 import os
-import json
+import hashlib
+import heapq
 import logging
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import orjson
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
 from langchain.chains import ConversationalRetrievalChain, RetrievalQA
-from langchain.memory import ConversationBufferMemory
+from langchain.memory import ConversationBufferMemory, ConversationSummaryBufferMemory
 from langchain.embeddings import HuggingFaceEmbeddings
+from langchain.embeddings.base import Embeddings
 from langchain.vectorstores import FAISS
 from langchain.llms import Groq
 from langchain.prompts import PromptTemplate
-from langchain.schema import Document
+from langchain.callbacks.base import BaseCallbackHandler
 from langchain.callbacks.manager import CallbackManager
 from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
 
 from app.models.player import Player, Recommendation, RecommendationResponse
 from app.models.chat import ChatRequest, ChatResponse
+from app.services.response_store import PersistentResponseCache
+from app.services.semantic_cache import ChatSemanticCache, RecommendationLSHCache
+from app.services.ttl_cache import LRUTTLCache
 
 logger = logging.getLogger(__name__)
 
+# Static part of the recommendation prompt, used by the QA chain's template.
+# It comes first and never changes, so the prompt prefix is byte-identical
+# across requests (provider prompt caching); the draft state is appended after it.
+RECOMMENDATION_PROMPT_PREFIX = (
+    "You are a fantasy football draft expert. Recommend the best next pick from the available players below, "
+    "using their real ESPN projections and value scores. Reply with only a JSON object of this shape:\n"
+    '{"primary_recommendation": {"player_name": str, "reasoning": str, "confidence_score": 0.0-1.0}, '
+    '"alternatives": [same shape as primary_recommendation], "strategy_notes": str}\n'
+)
+
+class QueryCachedEmbeddings(Embeddings):
+    """Embeddings wrapper that memoizes query embeddings.
+
+    Retrievers embed the same few questions over and over during a draft;
+    document embeddings pass straight through.
+    """
+
+    def __init__(self, embeddings: Embeddings, maxsize: int = 1024):
+        self.embeddings = embeddings
+        self._embed_query = lru_cache(maxsize=maxsize)(self._embed_query_uncached)
+
+    def _embed_query_uncached(self, text: str) -> tuple:
+        return tuple(self.embeddings.embed_query(text))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return list(self._embed_query(text))
+
+class AnswerTokenHandler(BaseCallbackHandler):
+    """Queues the LLM tokens of a chain's answer step.
+
+    ConversationalRetrievalChain may first call the LLM to condense the
+    question; only LLM runs nested under the answer chain are forwarded.
+    """
+
+    def __init__(self, answer_chain: str):
+        self.answer_chain = answer_chain
+        self.tokens: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._answer_runs = set()
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        name = ((serialized or {}).get("id") or [""])[-1]
+        if name == self.answer_chain or parent_run_id in self._answer_runs:
+            self._answer_runs.add(run_id)
+
+    def on_llm_new_token(self, token: str, *, run_id, parent_run_id=None, **kwargs):
+        if parent_run_id in self._answer_runs:
+            self.tokens.put(token)
+
 class RAGService:
     """RAG service for fantasy football recommendations and chat using LangChain and Groq LLM"""
 
     _instance = None
     _initialized = False
+    # Serializes creation so concurrent first callers build one instance (and
+    # one embedding model) and never see a half-initialized service
+    _singleton_lock = threading.Lock()
 
     def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(RAGService, cls).__new__(cls)
-        return cls._instance
+        with cls._singleton_lock:
+            if cls._instance is None:
+                cls._instance = super(RAGService, cls).__new__(cls)
+            return cls._instance
 
     def __init__(self):
-        if self._initialized:
-            return
-        self._initialized = True
-        
-        # Initialize embeddings using HuggingFace through LangChain
-        try:
-            self.embeddings = HuggingFaceEmbeddings(
-                model_name='all-MiniLM-L6-v2',
-                model_kwargs={'device': 'cpu'}
-            )
-            logger.info("HuggingFace embeddings loaded successfully")
-        except Exception as e:
-            logger.error(f"Error loading embeddings: {e}")
-            self.embeddings = None
-        
-        # Initialize vector store
-        self.vectorstore = FAISS.from_texts(
-            ["Initial empty store"], 
-            self.embeddings
-        )
-        
+        with self._singleton_lock:
+            if self._initialized:
+                return
+            self._setup()
+            self._initialized = True
+
+    def _setup(self):
+        """Load the LLM, embeddings, vector store, chains and caches"""
         # LLM configuration
         self.llm_type = self._detect_llm()
         
         # Initialize LangChain components
         self.llm = None
+        self.recommendation_llm = None
         if self.llm_type == "groq":
             try:
                 callback_manager = CallbackManager([StreamingStdOutCallbackHandler()])
-                self.llm = Groq(
+                groq_kwargs = dict(
                     api_key=os.environ["GROQ_API_KEY"],
                     model_name="llama3-8b-8192",
                     callback_manager=callback_manager,
                     temperature=0.7
                 )
+                self.llm = Groq(**groq_kwargs)
+                # JSON mode for the recommendation chain only; chat answers stay free text
+                self.recommendation_llm = Groq(**groq_kwargs,
+                                               model_kwargs={"response_format": {"type": "json_object"}})
                 logger.info("Groq LLM initialized successfully")
             except KeyError:
                 logger.warning("GROQ_API_KEY not found, falling back to rule-based responses")
@@ -74,23 +130,122 @@ class RAGService:
                 logger.error(f"Error initializing Groq LLM: {e}")
                 self.llm_type = "rule_based"
         
-        # Initialize conversation memory
-        self.memory = ConversationBufferMemory(
-            memory_key="chat_history",
-            return_messages=True,
-            output_key="answer"
-        )
+        # Embeddings and the vector store only feed the LLM chains; rule-based
+        # deployments never load the embedding model (or torch)
+        self.embeddings = None
+        self.vectorstore = None
+        # Document ID (player ID) -> indexed page content
+        self._indexed_docs: Dict[str, str] = {}
+        # Only the best-ranked available players are embedded; deeper players
+        # are never recommended and would just grow the index
+        self.vector_store_max_players = 200
+        # Held from the index update through retrieval and the chain call, so a
+        # request only retrieves its own players and FAISS never reads mid-write
+        self._vector_store_lock = threading.RLock()
+        if self.llm:
+            self._load_vector_store()
+        
+        # Initialize conversation memory. With an LLM, older turns are folded into
+        # a rolling summary so prompts stay bounded as the conversation grows.
+        if self.llm:
+            self.memory = ConversationSummaryBufferMemory(
+                llm=self.llm,
+                max_token_limit=512,
+                memory_key="chat_history",
+                return_messages=True,
+                output_key="answer"
+            )
+        else:
+            self.memory = ConversationBufferMemory(
+                memory_key="chat_history",
+                return_messages=True,
+                output_key="answer"
+            )
         
         # Initialize chains
         self.qa_chain = self._create_qa_chain() if self.llm else None
         self.chat_chain = self._create_chat_chain() if self.llm else None
+        # Runs streamed chat chains (the request thread drains their tokens)
+        self._stream_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="chat-stream")
         
         # Caching system
-        self.recommendation_cache = {}
-        self.chat_cache = {}
-        self.player_cache = {}
-        self.cache_duration = 300  # 5 minutes
+        self.cache_duration = 900  # 15 minutes (covers one live draft)
+        self.cache_max_entries = 5000
+        self.recommendation_cache = LRUTTLCache(maxsize=self.cache_max_entries, ttl=self.cache_duration)
+        self.chat_cache = LRUTTLCache(maxsize=self.cache_max_entries, ttl=self.cache_duration)
+        self.player_cache = LRUTTLCache(maxsize=self.cache_max_entries, ttl=self.cache_duration)
+        # Near-duplicate draft states (e.g. one player drafted) reuse recommendations
+        self.semantic_cache = RecommendationLSHCache(ttl=self.cache_duration)
+        # Paraphrased chat questions in the same draft context reuse LLM answers
+        self.chat_semantic_cache = ChatSemanticCache(ttl=self.cache_duration)
+        # LLM responses also go to disk so a restart doesn't re-ask the LLM
+        response_store_path = os.getenv("RAG_CACHE_PATH", "data/rag_cache.sqlite3")
+        self.response_store = (PersistentResponseCache(response_store_path, ttl=self.cache_duration)
+                               if self.llm and response_store_path else None)
+        
+    def _load_vector_store(self):
+        """Load the embedding model and create the player vector store"""
+        # Initialize embeddings using HuggingFace through LangChain
+        self._configure_torch_threads()
+        if os.getenv("QUANTIZED_EMBEDDINGS", "False").lower() == "true":
+            self.embeddings = self._load_quantized_embeddings()
+        if self.embeddings is None:
+            try:
+                self.embeddings = HuggingFaceEmbeddings(
+                    model_name='all-MiniLM-L6-v2',
+                    model_kwargs={'device': 'cpu'},
+                    # Player documents are short; large batches mean fewer forward passes
+                    encode_kwargs={'batch_size': 256, 'show_progress_bar': False}
+                )
+                logger.info("HuggingFace embeddings loaded successfully")
+            except Exception as e:
+                logger.error(f"Error loading embeddings: {e}")
+                self.embeddings = None
+        if self.embeddings is not None:
+            self.embeddings = QueryCachedEmbeddings(self.embeddings)
         
+        # Initialize vector store. It is updated in place (the chains' retrievers
+        # hold this instance); the placeholder is dropped on the first update.
+        self.vectorstore = FAISS.from_texts(
+            ["Initial empty store"], 
+            self.embeddings,
+            ids=["initial"]
+        )
+        self._indexed_docs = {"initial": "Initial empty store"}
+
+    @staticmethod
+    def _configure_torch_threads():
+        """Size torch's CPU thread pool for embedding (one thread per physical core per worker)"""
+        try:
+            import torch
+        except ImportError:
+            return
+        workers = max(1, int(os.getenv("WORKERS", 1)))
+        threads = int(os.getenv("EMBEDDING_THREADS", 0)) or max(1, (os.cpu_count() or 2) // 2 // workers)
+        torch.set_num_threads(threads)
+        try:
+            # Encoding is one op graph at a time; inter-op parallelism only oversubscribes
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Already fixed once torch has run parallel work
+            pass
+        logger.info(f"Torch using {threads} CPU threads for embeddings")
+
+    @staticmethod
+    def _load_quantized_embeddings():
+        """INT8-quantized BGE-small embeddings (same 384 dims as MiniLM), or None if unavailable"""
+        try:
+            from langchain_community.embeddings import QuantizedBgeEmbeddings
+            embeddings = QuantizedBgeEmbeddings(
+                model_name="Intel/bge-small-en-v1.5-sts-int8-static-inc",
+                encode_kwargs={"normalize_embeddings": True}
+            )
+            logger.info("Quantized BGE embeddings loaded successfully")
+            return embeddings
+        except Exception as e:
+            logger.warning(f"Quantized embeddings unavailable, using HuggingFace embeddings: {e}")
+            return None
+
     def _detect_llm(self):
         """Detect available LLM options"""
         # Try Groq first (preferred)
@@ -101,26 +256,40 @@ class RAGService:
         logger.info("No Groq API key found - using rule-based responses")
         return "rule_based"
 
-    def _get_cache_key(self, available_players: List[Player], user_team: Dict[str, Any], draft_context: Dict[str, Any]) -> str:
+    @staticmethod
+    def _digest(payload: Any) -> str:
+        """Stable digest of a JSON-able payload (same in every process, unlike hash())"""
+        data = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str)
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    @staticmethod
+    def _prompt_json(value: Any) -> str:
+        """Compact JSON with sorted keys, so prompts are stable across requests"""
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str).decode()
+
+    def recommendation_cache_key(self, available_players: List[Player], user_team: Dict[str, Any], draft_context: Dict[str, Any]) -> str:
         """Generate cache key for recommendations"""
         player_names = [p.name for p in available_players[:5]]  # Top 5 players
         team_players = [p.get('name', '') for p in user_team.get('players', [])]
-        context = f"{draft_context.get('current_round', '')}-{draft_context.get('current_pick', '')}"
+        context = [draft_context.get('current_round'), draft_context.get('current_pick')]
         
-        return f"{'-'.join(player_names)}:{'-'.join(team_players)}:{context}"
+        return f"rec:{self._digest([player_names, team_players, context])}"
     
-    def _get_chat_cache_key(self, request: ChatRequest) -> str:
+    def chat_cache_key(self, request: ChatRequest) -> str:
         """Generate cache key for chat requests"""
-        # Create a hash of the message and draft context
-        message_hash = hash(request.message.lower().strip())
-        context_hash = hash(str(request.draft_context))
-        
-        return f"chat:{message_hash}:{context_hash}"
+        # Hash the message and draft context (key order independent)
+        return f"chat:{self._digest([request.message.lower().strip(), request.draft_context])}"
 
-    def _is_cache_valid(self, cache_entry: tuple) -> bool:
-        """Check if cache entry is still valid"""
-        timestamp, _ = cache_entry
-        return datetime.now() - timestamp < timedelta(seconds=self.cache_duration)
+    def _get_chat_semantic_key(self, request: ChatRequest) -> Optional[Tuple[str, List[float]]]:
+        """Draft context digest and question embedding, or None without an LLM or embeddings"""
+        if not self.chat_chain or self.embeddings is None:
+            return None
+        try:
+            # Same text the chain retrieves with, so the memoized embedding is shared
+            return self._digest(request.draft_context), self.embeddings.embed_query(request.message)
+        except Exception as e:
+            logger.error(f"Error embedding chat question: {e}")
+            return None
 
     def _create_qa_chain(self):
         """Create chain for player recommendations"""
@@ -128,35 +297,19 @@ class RAGService:
             return None
             
         recommendation_prompt = PromptTemplate(
-            template="""You are a fantasy football draft expert assistant with access to real player data.
-            Given the following draft context and available players, recommend the best next pick.
-            
-            Draft Context: {context}
-            Available Players: {players}
-            User Team: {team}
-            
-            Analyze the data and provide recommendations in this JSON format:
-            {
-                "primary_recommendation": {
-                    "player_name": "string",
-                    "reasoning": "string",
-                    "confidence_score": float
-                },
-                "alternatives": [
-                    {
-                        "player_name": "string",
-                        "reasoning": "string",
-                        "confidence_score": float
-                    }
-                ],
-                "strategy_notes": "string"
-            }
-            """,
+            # Same compact static prefix as the direct prompt (literal braces doubled),
+            # with the per-request fields last so the prompt prefix stays identical
+            template=(
+                RECOMMENDATION_PROMPT_PREFIX.replace("{", "{{").replace("}", "}}") +
+                "Draft Context: {context}\n"
+                "Available Players: {players}\n"
+                "User Team: {team}\n"
+            ),
             input_variables=["context", "players", "team"]
         )
         
         return RetrievalQA.from_chain_type(
-            llm=self.llm,
+            llm=self.recommendation_llm or self.llm,
             chain_type="stuff",
             retriever=self.vectorstore.as_retriever(),
             chain_type_kwargs={
@@ -179,113 +332,153 @@ class RAGService:
     def get_recommendations(self, 
                           available_players: List[Player],
                           user_team: Dict[str, Any],
-                          draft_context: Dict[str, Any]) -> RecommendationResponse:
-        """Get player recommendations using LangChain QA chain or rule-based fallback"""
+                          draft_context: Dict[str, Any],
+                          cache_key: Optional[str] = None) -> RecommendationResponse:
+        """Get player recommendations using LangChain QA chain or rule-based fallback.
+
+        cache_key may be passed by callers that already computed it.
+        """
         
         # Check cache first
-        cache_key = self._get_cache_key(available_players, user_team, draft_context)
-        logger.info(f"Generated cache key: {cache_key[:100]}...")
-        logger.info(f"Current cache size: {len(self.recommendation_cache)}")
-        
-        if cache_key in self.recommendation_cache:
-            cache_entry = self.recommendation_cache[cache_key]
-            if self._is_cache_valid(cache_entry):
-                logger.info("✅ Cache hit! Returning cached recommendation")
-                return cache_entry[1]
-            else:
-                logger.info("⏰ Cache entry expired, removing...")
-                del self.recommendation_cache[cache_key]
-        else:
-            logger.info("❌ Cache miss - generating new recommendation")
-        
-        # Update vector store with current player data
-        self._update_vector_store(available_players)
+        if cache_key is None:
+            cache_key = self.recommendation_cache_key(available_players, user_team, draft_context)
+        logger.debug("Recommendation cache key %s (cache size %d)", cache_key, len(self.recommendation_cache))
+        
+        cached_response = self.recommendation_cache.get(cache_key)
+        if cached_response is not None:
+            logger.info("✅ Cache hit! Returning cached recommendation")
+            return cached_response
+        logger.info("❌ Cache miss - generating new recommendation")
+        
+        stored_response = self.response_store.get(cache_key, RecommendationResponse) if self.response_store else None
+        if stored_response is not None:
+            logger.info("✅ Persistent cache hit! Returning stored recommendation")
+            self.recommendation_cache.set(cache_key, stored_response)
+            return stored_response
+        
+        similar_response = self.semantic_cache.get(available_players, user_team, draft_context)
+        if similar_response is not None:
+            logger.info("✅ Semantic cache hit! Returning recommendation for a near-identical draft state")
+            self.recommendation_cache.set(cache_key, similar_response)
+            return similar_response
         
         # Get recommendations using LangChain if available
+        response = None
         if self.qa_chain:
             try:
                 # Format input for the chain
                 query = {
-                    "context": str(draft_context),
-                    "players": str([p.dict() for p in available_players[:10]]),
-                    "team": str(user_team)
+                    "context": self._prompt_json(draft_context),
+                    "players": self._prompt_json([p.model_dump() for p in available_players[:10]]),
+                    "team": self._prompt_json(user_team)
                 }
                 
-                # Get recommendation from chain
-                result = self.qa_chain(query)
+                # Index this request's players and retrieve from them before
+                # another request can swap the index contents
+                with self._vector_store_lock:
+                    self._update_vector_store(available_players)
+                    result = self.qa_chain(query)
                 response = self._parse_recommendation_response(result, available_players)
             except Exception as e:
                 logger.error(f"Error getting recommendations from LangChain: {e}")
-                response = self._rule_based_recommendations(available_players, user_team, draft_context)
-        else:
+        # Only LLM answers are persisted; a fallback shouldn't outlive a restart
+        from_llm = response is not None
+        if response is None:
             response = self._rule_based_recommendations(available_players, user_team, draft_context)
         
         # Cache the response
-        self.recommendation_cache[cache_key] = (datetime.now(), response)
-        logger.info(f"💾 Cached new recommendation for key: {cache_key[:50]}...")
-        logger.info(f"Updated cache size: {len(self.recommendation_cache)}")
+        self.recommendation_cache.set(cache_key, response)
+        self.semantic_cache.set(available_players, user_team, draft_context, response)
+        if self.response_store and from_llm:
+            self.response_store.set(cache_key, response)
+        logger.info("💾 Cached new recommendation (cache size %d)", len(self.recommendation_cache))
         
         return response
 
+    @staticmethod
+    def _player_document_content(player: Player) -> str:
+        """Text embedded for a player in the vector store"""
+        return (
+            f"{player.name} ({player.position}, {player.team})\n"
+            f"Rank: {player.rank}, Projected Points: {player.projected_points}\n"
+            f"Value Score: {player.value_score}, ADP: {player.adp}\n"
+            f"Status: {player.injury_status or 'Healthy'}"
+        )
+
     def _update_vector_store(self, players: List[Player]):
-        """Update vector store with current player data"""
-        if not players:
+        """Sync the vector store with current player data, embedding only new or changed players"""
+        if not players or self.vectorstore is None:
             return
-            
-        # Convert players to documents
-        documents = []
-        for player in players:
-            content = (
-                f"{player.name} ({player.position}, {player.team})\n"
-                f"Rank: {player.rank}, Projected Points: {player.projected_points}\n"
-                f"Value Score: {player.value_score}, ADP: {player.adp}\n"
-                f"Status: {player.injury_status or 'Healthy'}"
-            )
-            documents.append(Document(
-                page_content=content,
-                metadata=player.dict()
-            ))
-        
-        # Update vector store
-        self.vectorstore = FAISS.from_documents(documents, self.embeddings)
-        logger.info(f"Updated vector store with {len(documents)} player documents")
+        if len(players) > self.vector_store_max_players:
+            players = heapq.nsmallest(self.vector_store_max_players, players,
+                                      key=lambda p: p.rank or float('inf'))
+        
+        current = {player.id: player for player in players}
+        contents = {player_id: self._player_document_content(player) for player_id, player in current.items()}
+        
+        # Concurrent requests (threadpool) share the index; callers that then
+        # retrieve hold the (reentrant) lock across both steps
+        with self._vector_store_lock:
+            # Drafted (no longer available) and changed players leave the index
+            stale_ids = [doc_id for doc_id, content in self._indexed_docs.items()
+                         if contents.get(doc_id) != content]
+            new_ids = [player_id for player_id, content in contents.items()
+                       if self._indexed_docs.get(player_id) != content]
+            if not stale_ids and not new_ids:
+                return
+        
+            if stale_ids:
+                self.vectorstore.delete(stale_ids)
+                for doc_id in stale_ids:
+                    del self._indexed_docs[doc_id]
+            if new_ids:
+                self.vectorstore.add_texts(
+                    [contents[player_id] for player_id in new_ids],
+                    # Only identifies the document; nothing reads player fields back from it
+                    metadatas=[{"id": player_id, "name": current[player_id].name} for player_id in new_ids],
+                    ids=new_ids
+                )
+                for player_id in new_ids:
+                    self._indexed_docs[player_id] = contents[player_id]
+            logger.info(f"Updated vector store: {len(new_ids)} embedded, {len(stale_ids)} removed, "
+                        f"{len(self._indexed_docs)} player documents")
     
     def chat(self, request: ChatRequest) -> ChatResponse:
         """Get chat response using LangChain conversation chain or fallback"""
         
         # Check cache first
-        cache_key = self._get_chat_cache_key(request)
+        cache_key = self.chat_cache_key(request)
         logger.info(f"Generated chat cache key: {cache_key[:50]}...")
         logger.info(f"Current chat cache size: {len(self.chat_cache)}")
         
-        if cache_key in self.chat_cache:
-            cache_entry = self.chat_cache[cache_key]
-            if self._is_cache_valid(cache_entry):
-                logger.info("✅ Chat cache hit! Returning cached response")
-                return cache_entry[1]
-            else:
-                logger.info("⏰ Chat cache entry expired, removing...")
-                del self.chat_cache[cache_key]
-        else:
-            logger.info("❌ Chat cache miss - generating new response")
+        cached_response = self.chat_cache.get(cache_key)
+        if cached_response is not None:
+            logger.info("✅ Chat cache hit! Returning cached response")
+            return cached_response
+        logger.info("❌ Chat cache miss - generating new response")
+        
+        stored_response = self.response_store.get(cache_key, ChatResponse) if self.response_store else None
+        if stored_response is not None:
+            logger.info("✅ Persistent chat cache hit! Returning stored response")
+            self.chat_cache.set(cache_key, stored_response)
+            return stored_response
+        
+        semantic_key = self._get_chat_semantic_key(request)
+        if semantic_key is not None:
+            similar_response = self.chat_semantic_cache.get(*semantic_key)
+            if similar_response is not None:
+                logger.info("✅ Semantic chat cache hit! Returning answer to a similar question")
+                self.chat_cache.set(cache_key, similar_response)
+                return similar_response
         
         # Generate response using LangChain if available
         if self.chat_chain:
             try:
-                # Format the chat context
-                context = f"Draft Context: {request.draft_context}\n"
-                
-                # Get response from conversation chain
-                result = self.chat_chain({
-                    "question": request.message,
-                    "chat_history": self.memory.chat_memory.messages,
-                    "context": context
-                })
-                
-                response = ChatResponse(
-                    response=result["answer"],
-                    confidence=0.9 if result.get("source_documents") else 0.7
-                )
+                response = self._chat_chain_response(request)
+                if semantic_key is not None:
+                    self.chat_semantic_cache.set(*semantic_key, response)
+                if self.response_store:
+                    self.response_store.set(cache_key, response)
             except Exception as e:
                 logger.error(f"Error getting chat response from LangChain: {e}")
                 response = self._rule_based_chat(request)
@@ -293,30 +486,126 @@ class RAGService:
             response = self._rule_based_chat(request)
         
         # Cache the response
-        self.chat_cache[cache_key] = (datetime.now(), response)
+        self.chat_cache.set(cache_key, response)
         logger.info(f"💾 Cached new chat response for key: {cache_key[:50]}...")
         logger.info(f"Updated chat cache size: {len(self.chat_cache)}")
         
         return response
 
+    def _chat_chain_response(self, request: ChatRequest, callbacks=None) -> ChatResponse:
+        """Run the conversation chain for a chat request"""
+        # Format the chat context
+        context = f"Draft Context: {request.draft_context}\n"
+        
+        # Get response from conversation chain (retrieval must not overlap an index update)
+        with self._vector_store_lock:
+            result = self.chat_chain({
+                "question": request.message,
+                "chat_history": self.memory.chat_memory.messages,
+                "context": context
+            }, callbacks=callbacks)
+        
+        return ChatResponse(
+            response=result["answer"],
+            confidence=0.9 if result.get("source_documents") else 0.7
+        )
+
+    def stream_chat(self, request: ChatRequest) -> Iterator[str]:
+        """Yield the chat answer as the LLM generates it.
+
+        Cached and rule-based answers arrive as a single chunk. The finished
+        answer is cached the same way chat() caches it.
+        """
+        cache_key = self.chat_cache_key(request)
+        cached_response = self.chat_cache.get(cache_key)
+        if cached_response is not None:
+            yield cached_response.response
+            return
+        if not self.chat_chain:
+            response = self._rule_based_chat(request)
+            self.chat_cache.set(cache_key, response)
+            yield response.response
+            return
+        stored_response = self.response_store.get(cache_key, ChatResponse) if self.response_store else None
+        if stored_response is not None:
+            self.chat_cache.set(cache_key, stored_response)
+            yield stored_response.response
+            return
+        semantic_key = self._get_chat_semantic_key(request)
+        if semantic_key is not None:
+            similar_response = self.chat_semantic_cache.get(*semantic_key)
+            if similar_response is not None:
+                self.chat_cache.set(cache_key, similar_response)
+                yield similar_response.response
+                return
+
+        handler = AnswerTokenHandler(type(self.chat_chain.combine_docs_chain).__name__)
+        outcome: Dict[str, Any] = {}
+
+        def run_chain():
+            try:
+                outcome["response"] = self._chat_chain_response(request, callbacks=[handler])
+            except Exception as e:
+                outcome["error"] = e
+            finally:
+                handler.tokens.put(None)
+
+        self._stream_executor.submit(run_chain)
+        streamed = False
+        for token in iter(handler.tokens.get, None):
+            streamed = True
+            yield token
+
+        response = outcome.get("response")
+        if response is None:
+            logger.error(f"Error streaming chat response from LangChain: {outcome.get('error')}")
+            if not streamed:
+                yield self._rule_based_chat(request).response
+            return
+        self.chat_cache.set(cache_key, response)
+        if semantic_key is not None:
+            self.chat_semantic_cache.set(*semantic_key, response)
+        if self.response_store:
+            self.response_store.set(cache_key, response)
+        if not streamed:
+            # The LLM didn't emit tokens; send the whole answer
+            yield response.response
+
     def clear_cache(self):
         """Clear all caches"""
         self.recommendation_cache.clear()
         self.chat_cache.clear()
         self.player_cache.clear()
+        self.semantic_cache.clear()
+        self.chat_semantic_cache.clear()
+        self._rule_based_response.cache_clear()
+        if self.response_store:
+            self.response_store.clear()
         logger.info("All caches cleared")
 
     def clear_chat_cache(self):
         """Clear only the chat cache"""
         self.chat_cache.clear()
+        self.chat_semantic_cache.clear()
+        if self.response_store:
+            self.response_store.clear("chat:")
         logger.info("Chat cache cleared")
 
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
         return {
             "recommendation_cache_size": len(self.recommendation_cache),
+            "recommendation_cache": self.recommendation_cache.stats(),
             "chat_cache_size": len(self.chat_cache),
+            "chat_cache": self.chat_cache.stats(),
             "player_cache_size": len(self.player_cache),
+            "player_cache": self.player_cache.stats(),
+            "semantic_cache_size": len(self.semantic_cache),
+            "semantic_cache_hits": self.semantic_cache.hits,
+            "semantic_cache_misses": self.semantic_cache.misses,
+            "chat_semantic_cache_size": len(self.chat_semantic_cache),
+            "chat_semantic_cache_hits": self.chat_semantic_cache.hits,
+            "chat_semantic_cache_misses": self.chat_semantic_cache.misses,
             "cache_duration_seconds": self.cache_duration
         }
     
@@ -328,33 +617,6 @@ class RAGService:
 
 
 
-    # --- Groq LLM ---
-    def _groq_recommendations(self, available_players, user_team, draft_context):
-        """Get recommendations from Groq LLM"""
-        if not self.groq_client:
-            logger.warning("Groq client not available, falling back to rule-based recommendations")
-            return self._rule_based_recommendations(available_players, user_team, draft_context)
-            
-        prompt = self._build_recommendation_prompt(available_players, user_team, draft_context)
-        logger.info(f"Groq recommendation prompt: {prompt[:200]}...")
-        
-        try:
-            completion = self.groq_client.chat.completions.create(
-                model="llama3-8b-8192",  # Fast and reliable model
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=512,
-                temperature=0.7,
-            )
-            text = completion.choices[0].message.content
-            logger.info(f"Groq recommendation response: {text[:200]}...")
-            return self._parse_llm_recommendations(text, available_players)
-        except Exception as e:
-            logger.error(f"Groq API error: {e}")
-            logger.info("Falling back to rule-based recommendations")
-            return self._rule_based_recommendations(available_players, user_team, draft_context)
-
     # --- Rule-based fallback ---
     def _rule_based_recommendations(self, available_players, user_team, draft_context):
         """Rule-based recommendations when LLM is not available"""
@@ -381,8 +643,10 @@ class RAGService:
             )
         
         # Use the actual enriched players instead of fallback data
-        # Sort players by rank (lower is better) and projected points
-        sorted_players = sorted(available_players, key=lambda p: (p.rank or float('inf'), -(p.projected_points or 0)))
+        # Best 3 players by rank (lower is better) and projected points; only
+        # the primary pick and two alternatives are used, so skip a full sort
+        sorted_players = heapq.nsmallest(3, available_players,
+                                         key=lambda p: (p.rank or float('inf'), -(p.projected_points or 0)))
         
         if not sorted_players:
             return RecommendationResponse(
@@ -404,6 +668,13 @@ class RAGService:
                 next_picks_suggestion=[]
             )
         
+        return self._rule_based_response(tuple(sorted_players))
+
+    # Players are frozen and hash by value, so unchanged top picks reuse one response
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _rule_based_response(sorted_players: tuple) -> RecommendationResponse:
+        """Rule-based response for the top (up to 3) players"""
         # Use the top player as primary recommendation
         primary_player = sorted_players[0]
         
@@ -444,6 +715,9 @@ class RAGService:
             confidence=0.6
         )
 
+    # --- Groq LLM ---
+    # Direct Groq-client chat. Not wired up (groq_client is never set);
+    # recommendations and chat go through the LangChain chains above.
     def _groq_chat(self, request: ChatRequest) -> ChatResponse:
         if not self.groq_client:
             logger.warning("Groq client not available, falling back to rule-based chat")
@@ -484,37 +758,6 @@ class RAGService:
             return self._rule_based_chat(request)
 
     # --- Prompt builders and parsers ---
-    def _build_recommendation_prompt(self, available_players, user_team, draft_context):
-        player_lines = [
-            f"{p.name} ({p.position}, {p.team}, Rank: {p.rank}, Proj: {p.projected_points}, Value: {p.value_score})"
-            for p in available_players[:10]
-        ]
-        prompt = (
-            "You are a fantasy football draft expert assistant with access to real ESPN fantasy data. "
-            "Given the following draft context, user team, and available players with real ESPN projections, recommend the best next pick. "
-            "Use the real fantasy projections and value scores to make data-driven recommendations. "
-            "Explain your reasoning in detail and format your response as JSON.\n"
-            f"Draft Context: Round {draft_context.get('current_round', 'N/A')}, Pick {draft_context.get('current_pick', 'N/A')}, Total Teams: {draft_context.get('total_teams', 'N/A')}\n"
-            f"User Team: Players: {[p.get('name', '') for p in user_team.get('players', [])]}, Position Counts: {user_team.get('position_counts', {})}\n"
-            f"Available Players (with ESPN projections): {', '.join(player_lines)}\n"
-            "Please recommend the best player using real ESPN fantasy projections and value analysis. Format your response as JSON: {\n"
-            "  \"primary_recommendation\": {\n"
-            "    \"player_name\": \"string\",\n"
-            "    \"reasoning\": \"string (include ESPN projections and value analysis)\",\n"
-            "    \"confidence_score\": 0.0-1.0\n"
-            "  },\n"
-            "  \"alternatives\": [\n"
-            "    {\n"
-            "      \"player_name\": \"string\",\n"
-            "      \"reasoning\": \"string (include ESPN projections and value analysis)\",\n"
-            "      \"confidence_score\": 0.0-1.0\n"
-            "    }\n"
-            "  ],\n"
-            "  \"strategy_notes\": \"string (include ESPN data insights)\"\n"
-            "}\n"
-        )
-        return prompt
-
     def _build_chat_prompt(self, request):
         prompt = (
             "You are a fantasy football draft expert assistant with access to real ESPN fantasy data and projections. "
@@ -528,29 +771,28 @@ class RAGService:
         )
         return prompt
 
-    def _parse_recommendation_response(self, result, available_players):
-        """Parse LangChain recommendation response"""
+    def _parse_recommendation_response(self, result, available_players) -> Optional[RecommendationResponse]:
+        """Parse LangChain recommendation response, or None if it is unusable"""
         try:
             # Extract JSON from response
             response_text = result.get('result', '') or result.get('answer', '')
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
+            try:
+                # JSON-mode replies (and well-behaved ones) are a bare object
+                data = orjson.loads(response_text)
+            except orjson.JSONDecodeError:
+                json_start = response_text.find('{')
+                json_end = response_text.rfind('}') + 1
+                data = orjson.loads(response_text[json_start:json_end] if json_start != -1 else response_text)
             
-            if json_start != -1 and json_end != -1:
-                json_str = response_text[json_start:json_end]
-                data = json.loads(json_str)
-            else:
-                data = json.loads(response_text)
+            # Lowercased name -> player (first occurrence wins)
+            players_by_name = {player.name.lower(): player for player in reversed(available_players)}
             
             # Find primary recommendation player
-            primary_player = self._find_player_by_name(
-                data["primary_recommendation"]["player_name"], 
-                available_players
-            )
+            primary_player = players_by_name.get(data["primary_recommendation"]["player_name"].lower())
             
             if not primary_player:
                 logger.warning("Primary recommended player not found in available players")
-                return self._rule_based_recommendations(available_players, {}, {})
+                return None
                 
             # Create primary recommendation
             primary_rec = Recommendation(
@@ -562,7 +804,7 @@ class RAGService:
             # Process alternative recommendations
             alternatives = []
             for alt in data.get("alternatives", []):
-                alt_player = self._find_player_by_name(alt["player_name"], available_players)
+                alt_player = players_by_name.get(alt["player_name"].lower())
                 if alt_player:
                     alternatives.append(Recommendation(
                         player=alt_player,
@@ -583,15 +825,9 @@ class RAGService:
             )
         except Exception as e:
             logger.error(f"Error parsing LangChain recommendations: {e}")
-            return self._rule_based_recommendations(available_players, {}, {})
+            return None
 
     def _process_chat_response(self, text):
         """Process chat response - return as-is for now"""
-        return text
-
-    def _find_player_by_name(self, name, players):
-        for player in players:
-            if player.name.lower() == name.lower():
-                return player
-        return None 
+        return text 
     
\ No newline at end of file
@@ -0,0 +1,70 @@
+import os
+import time
+import logging
+import sqlite3
+import threading
+from typing import Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+class PersistentResponseCache:
+    """SQLite-backed second tier for LLM responses, so warm restarts skip the LLM.
+
+    Responses are stored as pydantic JSON with a wall-clock expiry (monotonic
+    time doesn't survive a restart). If the database can't be opened the
+    cache stays disabled and every lookup misses.
+    """
+
+    def __init__(self, path: str, ttl: float = 900):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS responses "
+                       "(key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)")
+            db.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+            self._db = db
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent response cache disabled ({path}): {e}")
+
+    def get(self, key: str, model: Type[ModelT]) -> Optional[ModelT]:
+        """Get a fresh stored response as an instance of model, or None"""
+        if self._db is None:
+            return None
+        try:
+            with self._lock:
+                row = self._db.execute("SELECT value FROM responses WHERE key = ? AND expires_at > ?",
+                                       (key, time.time())).fetchone()
+            return model.model_validate_json(row[0]) if row else None
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Error reading persistent response cache: {e}")
+            return None
+
+    def set(self, key: str, response: BaseModel):
+        """Store a response until the TTL runs out"""
+        if self._db is None:
+            return
+        try:
+            with self._lock:
+                self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                                 (key, time.time() + self.ttl, response.model_dump_json()))
+        except sqlite3.Error as e:
+            logger.warning(f"Error writing persistent response cache: {e}")
+
+    def clear(self, prefix: str = ""):
+        """Drop stored responses whose key starts with prefix (all by default)"""
+        if self._db is None:
+            return
+        try:
+            with self._lock:
+                self._db.execute("DELETE FROM responses WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+        except sqlite3.Error as e:
+            logger.warning(f"Error clearing persistent response cache: {e}")
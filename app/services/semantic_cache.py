@@ -0,0 +1,218 @@
+import math
+import time
+import threading
+import hashlib
+import logging
+from itertools import combinations
+from typing import List, Dict, Any, Optional, Sequence, Tuple, FrozenSet
+
+from app.models.player import Player, RecommendationResponse
+from app.models.chat import ChatResponse
+
+logger = logging.getLogger(__name__)
+
+class RecommendationLSHCache:
+    """Near-duplicate cache for recommendations using SimHash locality-sensitive hashing.
+
+    Draft states are hashed to a 32-bit signature over their features (available
+    players, team composition, round and pick). Lookups probe every signature
+    within a small Hamming distance, then only reuse a cached response when the
+    draft context matches exactly, the available players overlap strongly and
+    every recommended player is still available.
+    """
+
+    SIGNATURE_BITS = 32
+
+    def __init__(self, ttl: int = 300, max_entries: int = 1000,
+                 max_hamming_distance: int = 2, min_jaccard: float = 0.9):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.min_jaccard = min_jaccard
+        self._buckets: Dict[int, List[Tuple[float, Tuple, FrozenSet[str], RecommendationResponse]]] = {}
+        self._size = 0
+        self._probe_masks = self._build_probe_masks(max_hamming_distance)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def _build_probe_masks(cls, max_distance: int) -> List[int]:
+        """XOR masks for every signature within max_distance bits"""
+        masks = [0]
+        for distance in range(1, max_distance + 1):
+            for bits in combinations(range(cls.SIGNATURE_BITS), distance):
+                mask = 0
+                for bit in bits:
+                    mask |= 1 << bit
+                masks.append(mask)
+        return masks
+
+    @staticmethod
+    def _feature_hash(feature: str) -> int:
+        return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=4).digest(), "little")
+
+    def _signature(self, features: List[str]) -> int:
+        """SimHash: each bit is the sign of the summed +/-1 feature votes"""
+        votes = [0] * self.SIGNATURE_BITS
+        for feature in features:
+            feature_hash = self._feature_hash(feature)
+            for bit in range(self.SIGNATURE_BITS):
+                votes[bit] += 1 if feature_hash >> bit & 1 else -1
+        signature = 0
+        for bit, vote in enumerate(votes):
+            if vote > 0:
+                signature |= 1 << bit
+        return signature
+
+    @staticmethod
+    def _context(user_team: Dict[str, Any], draft_context: Dict[str, Any]) -> Tuple:
+        """Exact-match part of the draft state"""
+        position_counts = user_team.get("position_counts") or {}
+        team_players = tuple(sorted(p.get("name", "") for p in user_team.get("players", [])))
+        return (
+            draft_context.get("current_round"),
+            draft_context.get("current_pick"),
+            tuple(sorted((str(k), v) for k, v in position_counts.items())),
+            team_players,
+        )
+
+    def _key(self, available_players: List[Player], user_team: Dict[str, Any],
+             draft_context: Dict[str, Any]) -> Tuple[int, Tuple, FrozenSet[str]]:
+        available = frozenset(p.name.lower() for p in available_players)
+        context = self._context(user_team, draft_context)
+        features = [f"player:{name}" for name in available]
+        features.append(f"context:{context}")
+        return self._signature(features), context, available
+
+    def get(self, available_players: List[Player], user_team: Dict[str, Any],
+            draft_context: Dict[str, Any]) -> Optional[RecommendationResponse]:
+        """Get a cached response for a near-identical draft state"""
+        signature, context, available = self._key(available_players, user_team, draft_context)
+        with self._lock:
+            now = time.monotonic()
+            for mask in self._probe_masks:
+                for created, cached_context, cached_available, response in self._buckets.get(signature ^ mask, ()):
+                    if now - created >= self.ttl or cached_context != context:
+                        continue
+                    overlap = len(available & cached_available) / len(available | cached_available)
+                    if overlap < self.min_jaccard:
+                        continue
+                    if not self._recommended_still_available(response, available):
+                        continue
+                    self.hits += 1
+                    return response
+
+            self.misses += 1
+            return None
+
+    @staticmethod
+    def _recommended_still_available(response: RecommendationResponse, available: FrozenSet[str]) -> bool:
+        recommendations = [response.primary_recommendation] + list(response.alternative_recommendations)
+        return all(rec.player.name.lower() in available for rec in recommendations)
+
+    def set(self, available_players: List[Player], user_team: Dict[str, Any],
+            draft_context: Dict[str, Any], response: RecommendationResponse):
+        """Store a response for this draft state"""
+        if not available_players:
+            return
+        signature, context, available = self._key(available_players, user_team, draft_context)
+        with self._lock:
+            if self._size >= self.max_entries:
+                self._evict()
+            self._buckets.setdefault(signature, []).append((time.monotonic(), context, available, response))
+            self._size += 1
+
+    def _evict(self):
+        """Drop expired entries, or the oldest bucket if none expired (caller holds the lock)"""
+        now = time.monotonic()
+        for signature in list(self._buckets):
+            entries = [entry for entry in self._buckets[signature] if now - entry[0] < self.ttl]
+            if entries:
+                self._buckets[signature] = entries
+            else:
+                del self._buckets[signature]
+        self._size = sum(len(entries) for entries in self._buckets.values())
+        if self._size >= self.max_entries and self._buckets:
+            oldest = next(iter(self._buckets))
+            self._size -= len(self._buckets.pop(oldest))
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._size = 0
+
+    def __len__(self):
+        return self._size
+
+class ChatSemanticCache:
+    """Paraphrase cache for chat answers over question embeddings.
+
+    Answers are only reused for the same draft context (compared by digest);
+    within it, the most similar earlier question is reused when its cosine
+    similarity clears min_similarity.
+    """
+
+    def __init__(self, ttl: int = 900, max_entries: int = 1000, min_similarity: float = 0.92):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.min_similarity = min_similarity
+        self._contexts: Dict[str, List[Tuple[float, Tuple[float, ...], ChatResponse]]] = {}
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> Tuple[float, ...]:
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return tuple(x / norm for x in vector)
+
+    def get(self, context_key: str, vector: Sequence[float]) -> Optional[ChatResponse]:
+        """Get the answer to the closest cached question asked in this context"""
+        query = self._normalize(vector)
+        with self._lock:
+            now = time.monotonic()
+            best_similarity, best_response = self.min_similarity, None
+            for created, cached_vector, response in self._contexts.get(context_key, ()):
+                if now - created >= self.ttl:
+                    continue
+                similarity = sum(a * b for a, b in zip(query, cached_vector))
+                if similarity >= best_similarity:
+                    best_similarity, best_response = similarity, response
+
+            if best_response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return best_response
+
+    def set(self, context_key: str, vector: Sequence[float], response: ChatResponse):
+        """Store the answer to a question asked in this context"""
+        vector = self._normalize(vector)
+        with self._lock:
+            if self._size >= self.max_entries:
+                self._evict()
+            self._contexts.setdefault(context_key, []).append((time.monotonic(), vector, response))
+            self._size += 1
+
+    def _evict(self):
+        """Drop expired entries, or the oldest context if none expired (caller holds the lock)"""
+        now = time.monotonic()
+        for context_key in list(self._contexts):
+            entries = [entry for entry in self._contexts[context_key] if now - entry[0] < self.ttl]
+            if entries:
+                self._contexts[context_key] = entries
+            else:
+                del self._contexts[context_key]
+        self._size = sum(len(entries) for entries in self._contexts.values())
+        if self._size >= self.max_entries and self._contexts:
+            oldest = next(iter(self._contexts))
+            self._size -= len(self._contexts.pop(oldest))
+
+    def clear(self):
+        with self._lock:
+            self._contexts.clear()
+            self._size = 0
+
+    def __len__(self):
+        return self._size